@@ -44,6 +44,7 @@ INSTALLED_APPS += [
 ]
 
 MIDDLEWARE = [
+    'hisab.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,7 +58,8 @@ ROOT_URLCONF = 'HisabDe.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to ServerTimingMiddleware
+        'BACKEND': 'hisab.instrumentation.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates']
         ,
         'APP_DIRS': True,
@@ -82,9 +84,41 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Take the write lock when atomic() begins: a transaction that read first
+            # and then writes can otherwise fail with "database is locked" at once,
+            # without waiting for busy_timeout
+            'transaction_mode': 'IMMEDIATE',
+        },
     }
 }
 
+# Applied to every new SQLite connection by hisab.sqlite.configure_sqlite, in this order
+HISAB_SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,  # ms to wait for a lock before "database is locked"
+    'journal_mode': 'WAL',  # readers no longer block on, or block, the writer
+    'synchronous': 'NORMAL',  # durable at checkpoints; safe from corruption in WAL mode
+    'cache_size': -20000,  # KiB of page cache per connection
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Read-only copy of the primary for reporting reads (statements, exports, balance
+# history, admin changelists). Locally this can be a second SQLite file kept in
+# step with db.sqlite3; it is only used once HISAB_REPORTING_DATABASE names it.
+DATABASES['reporting'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': BASE_DIR / 'reporting.sqlite3',
+    'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+}
+
+DATABASE_ROUTERS = ['hisab.routers.ReportingRouter']
+
+# Alias reporting reads go to; None keeps every query on the default database
+HISAB_REPORTING_DATABASE = env('HISAB_REPORTING_DATABASE', default=None) if env else None
+# After writing, a user's reporting reads stay on the primary this long (read-your-writes)
+HISAB_PRIMARY_PIN_SECONDS = 10
+
 
 # DATABASES = {
 #     'default': {
@@ -128,11 +162,83 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; any Django cache backend can be configured here
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'hisabde',
+        # Dashboard cards take one entry per account; the default of 300 culls them
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    }
+}
+
+# Cache alias and timeout (seconds) for per-user ledger data
+HISAB_CACHE_ALIAS = 'default'
+HISAB_BALANCE_CACHE_TIMEOUT = 60 * 60
+# Rendered dashboard account cards; keys change with the account, so this only bounds memory
+HISAB_CARD_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Transactions shown (and bound into the formset) per page
+HISAB_TRANSACTIONS_PER_PAGE = 50
+
+# Accounts with more transactions than this are hidden on delete and removed later
+# by the purge_deleted_accounts command; smaller ones are purged during the request
+HISAB_INLINE_DELETE_LIMIT = 10000
+# Transactions removed per DELETE statement (and database transaction) when purging
+HISAB_PURGE_CHUNK_SIZE = 5000
+
+# Upper bound on points returned by the balance series endpoint
+HISAB_BALANCE_SERIES_MAX_POINTS = 120
+
+# Route the dashboard and account details to their async views (for ASGI deployments)
+HISAB_ASYNC_VIEWS = env.bool('HISAB_ASYNC_VIEWS', default=False) if env else False
+
+# Per-request instrumentation (hisab.middleware.ServerTimingMiddleware)
+HISAB_SERVER_TIMING = DEBUG
+
+# Maximum SQL queries per request, by URL name; checked when HISAB_QUERY_BUDGETS_ENFORCED
+HISAB_QUERY_BUDGETS_ENFORCED = DEBUG
+HISAB_QUERY_BUDGETS = {
+    'hisab_dashboard': 6,
+    'account_details': HISAB_TRANSACTIONS_PER_PAGE + 15,  # POST validates one page
+    'edit_account': HISAB_TRANSACTIONS_PER_PAGE + 15,
+    'delete_account': 22,  # Hiding the account, then up to two purge chunks (HISAB_INLINE_DELETE_LIMIT)
+    'account_statement': 10,
+    'create_transaction': 15,
+    'update_transaction': 15,
+    'delete_transaction': 15,
+    'balance_series': 8,
+    'balance_as_of': 8,
+    'search_transactions': 6,
+    'admin:hisab_account_changelist': 12,
+    'admin:hisab_transaction_changelist': 12,
+}
+HISAB_DEFAULT_QUERY_BUDGET = 50
+# 'warn' logs over-budget requests, 'raise' raises QueryBudgetExceeded
+HISAB_QUERY_BUDGET_ACTION = 'warn'
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Hashed file names and precompressed .gz/.br copies, written by collectstatic. In
+# DEBUG, runserver serves the unhashed sources from STATICFILES_DIRS instead.
+HISAB_STATIC_MANIFEST = env.bool('HISAB_STATIC_MANIFEST', default=not DEBUG) if env else not DEBUG
+if HISAB_STATIC_MANIFEST:
+    STORAGES = {
+        'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+        'staticfiles': {'BACKEND': 'hisab.staticfiles.CompressedManifestStaticFilesStorage'},
+    }
+# Serve STATIC_ROOT from Django (hisab.staticfiles.serve_static) when no web server
+# in front of it does
+HISAB_SERVE_STATIC = env.bool('HISAB_SERVE_STATIC', default=HISAB_STATIC_MANIFEST) if env else HISAB_STATIC_MANIFEST
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -145,14 +251,26 @@ LOGIN_URL = '/auth/login/'
 LOGIN_REDIRECT_URL = '/auth/dashboard/'
 LOGOUT_REDIRECT_URL = '/auth/login/'
 
+# Serve sessions and the logged-in user from the cache, so authenticated requests
+# make no session or user queries before the view runs. Needs a cache shared by
+# every worker process (not LocMemCache) once more than one process serves requests.
+# Switching it on or off logs everyone out once, since sessions record their backend.
+HISAB_CACHED_AUTH = env.bool('HISAB_CACHED_AUTH', default=False) if env else False
+if HISAB_CACHED_AUTH:
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+    AUTHENTICATION_BACKENDS = ['user.backends.CachedModelBackend']
+# Cache alias and timeout (seconds) for users loaded by user.backends.CachedModelBackend
+USER_CACHE_ALIAS = 'default'
+USER_CACHE_TIMEOUT = 5 * 60
+
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
-EMAIL_HOST_USER = env('EMAIL_HOST_USER')
-EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD')
-DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL')
+EMAIL_HOST_USER = env('EMAIL_HOST_USER', default='') if env else ''
+EMAIL_HOST_PASSWORD = env('EMAIL_HOST_PASSWORD', default='') if env else ''
+DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL', default='webmaster@localhost') if env else 'webmaster@localhost'
 
 # Password Reset Token Timeout (1 hour)
 PASSWORD_RESET_TIMEOUT = 3600
@@ -14,9 +14,13 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.shortcuts import redirect
+from hisab.staticfiles import serve_static
 
 def home_redirect(request):
     """Redirect home to login"""
@@ -35,3 +39,8 @@ urlpatterns = [
     path('auth/', include('user.urls')),
     path('hisab/', include('hisab.urls')),
 ]
+
+if settings.HISAB_SERVE_STATIC:
+    urlpatterns += [
+        re_path(rf'^{re.escape(settings.STATIC_URL.lstrip("/"))}(?P<path>.+)$', serve_static),
+    ]
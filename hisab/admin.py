@@ -1,7 +1,58 @@
+from django import forms
 from django.contrib import admin
-from django.db.models import Sum
+from django.contrib.admin.widgets import AutocompleteSelect
 from django.utils.html import format_html
+from .exporters import ledger_export_response
 from .models import Account, Transaction
+from .routers import reporting
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """
+    Related-object filter rendered as an admin autocomplete instead of a list
+    of every related object. Only the selected object is ever loaded; the
+    related model's admin must define search_fields.
+    """
+    template = 'admin/hisab/autocomplete_filter.html'
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+        self.form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            widget=AutocompleteSelect(field, model_admin.admin_site),
+            required=False,
+        )
+
+    def field_choices(self, field, request, model_admin):
+        return []
+
+    def has_output(self):
+        return True
+
+    def widget(self):
+        value = self.lookup_val[-1] if self.lookup_val else None
+        return self.form_field.widget.render(
+            self.lookup_kwarg, value, attrs={'id': f'filter_{self.lookup_kwarg}'}
+        )
+
+
+class AutocompleteFilterMixin:
+    """Adds the select2 assets AutocompleteFilter needs to the changelist"""
+
+    @property
+    def media(self):
+        widget = AutocompleteSelect(Account._meta.get_field('user'), self.admin_site)
+        return super().media + widget.media
+
+
+class ReportingChangelistMixin:
+    """Reads changelist pages from the reporting database; actions and list edits stay on the primary"""
+
+    def changelist_view(self, request, extra_context=None):
+        if request.method != 'GET':
+            return super().changelist_view(request, extra_context)
+        with reporting(request.user):
+            return super().changelist_view(request, extra_context)
 
 
 class TransactionInline(admin.TabularInline):
@@ -19,7 +70,7 @@ class TransactionInline(admin.TabularInline):
 
 
 @admin.register(Account)
-class AccountAdmin(admin.ModelAdmin):
+class AccountAdmin(ReportingChangelistMixin, AutocompleteFilterMixin, admin.ModelAdmin):
     """Admin interface for Account with inline transactions"""
     
     inlines = [TransactionInline]
@@ -40,9 +91,12 @@ class AccountAdmin(admin.ModelAdmin):
         'reminder_interval', 
         'created_at', 
         'updated_at',
-        'user'
+        ('user', AutocompleteFilter)
     )
     
+    # Newest first by primary key, also used by the autocomplete filters
+    ordering = ('-pk',)
+
     search_fields = (
         'name', 
         'email', 
@@ -77,9 +131,7 @@ class AccountAdmin(admin.ModelAdmin):
     
     def total_amount_display(self, obj):
         """Display total amount with color coding"""
-        total = Transaction.objects.filter(account=obj).aggregate(
-            total=Sum('amount')
-        )['total'] or 0
+        total = obj.balance
         
         color = 'green' if total >= 0 else 'red'
         symbol = '+' if total >= 0 else ''
@@ -89,12 +141,13 @@ class AccountAdmin(admin.ModelAdmin):
             color, symbol, abs(total)
         )
     total_amount_display.short_description = 'Total Amount'
+    total_amount_display.admin_order_field = 'balance'
     
     def transaction_count(self, obj):
         """Display number of transactions"""
-        count = Transaction.objects.filter(account=obj).count()
-        return f"{count} transactions"
+        return f"{obj.transaction_count} transactions"
     transaction_count.short_description = 'Transaction Count'
+    transaction_count.admin_order_field = 'transaction_count'
     
     def get_queryset(self, request):
         """Optimize queries"""
@@ -102,7 +155,7 @@ class AccountAdmin(admin.ModelAdmin):
 
 
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(ReportingChangelistMixin, AutocompleteFilterMixin, admin.ModelAdmin):
     """Admin interface for individual Transaction management"""
     
     list_display = (
@@ -115,9 +168,12 @@ class TransactionAdmin(admin.ModelAdmin):
     
     list_filter = (
         'date', 
-        'account__user',
-        'account__name'
+        ('account__user', AutocompleteFilter),
+        ('account', AutocompleteFilter)
     )
+
+    # Skip the unfiltered COUNT(*) over the whole table on every page
+    show_full_result_count = False
     
     search_fields = (
         'description', 
@@ -128,6 +184,8 @@ class TransactionAdmin(admin.ModelAdmin):
     
     readonly_fields = ('date',)
     
+    actions = ['export_as_csv']
+    
     fieldsets = (
         ('Transaction Details', {
             'fields': ('account', 'description', 'amount')
@@ -162,6 +220,12 @@ class TransactionAdmin(admin.ModelAdmin):
         )
     amount_display.short_description = 'Amount'
     
+    @admin.action(description='Export selected transactions as CSV')
+    def export_as_csv(self, request, queryset):
+        """Stream the selection (or every filtered row) with running balances"""
+        with reporting(request.user):
+            return ledger_export_response(queryset, 'hisab-transactions')
+    
     def get_queryset(self, request):
         """Optimize queries"""
         return super().get_queryset(request).select_related('account', 'account__user')
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class HisabConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hisab'
+
+    def ready(self):
+        from .sqlite import configure_sqlite
+        connection_created.connect(configure_sqlite, dispatch_uid='hisab_configure_sqlite')
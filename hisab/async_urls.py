@@ -0,0 +1,17 @@
+"""
+Project URLconf with the dashboard and account details routed to their
+async views, whatever HISAB_ASYNC_VIEWS says. Used by the tests and by
+bench_concurrency to compare both sets of views in one process; /hisab/
+still reaches the sync dashboard.
+"""
+from django.urls import path
+
+from HisabDe import urls as project_urls
+
+from . import views
+
+urlpatterns = [
+    path('hisab/dashboard/', views.adashboard_view, name='hisab_dashboard'),
+    path('hisab/account/<int:account_id>/details/', views.aaccount_details, name='account_details'),
+    *project_urls.urlpatterns,
+]
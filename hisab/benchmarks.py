@@ -0,0 +1,274 @@
+import asyncio
+import json
+import math
+import multiprocessing
+import platform
+import random
+import sqlite3
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from decimal import Decimal
+from io import BytesIO
+
+import django
+from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+from django.db import OperationalError, connection, connections
+from django.test.utils import (
+    CaptureQueriesContext, setup_test_environment, teardown_test_environment,
+)
+from django.utils import timezone
+
+from .models import Account, Transaction
+
+
+def base_report(**fields):
+    """A benchmark report: when and on which versions it ran, then `fields`"""
+    return {
+        'created_at': timezone.now().isoformat(),
+        'django': django.get_version(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        **fields,
+    }
+
+
+def write_report(command, report, path):
+    """Write report as JSON to path, or to the command's stdout without one"""
+    output = json.dumps(report, indent=2)
+    if path:
+        with open(path, 'w') as report_file:
+            report_file.write(output + '\n')
+    else:
+        command.stdout.write(output)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list of numbers"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered), math.ceil(pct / 100 * len(ordered))) - 1)
+    return ordered[index]
+
+
+def summarize(durations, query_counts):
+    """Latency percentiles (ms) and query counts for one scenario"""
+    return {
+        'iterations': len(durations),
+        'mean_ms': round(statistics.fmean(durations), 3),
+        'p50_ms': round(percentile(durations, 50), 3),
+        'p90_ms': round(percentile(durations, 90), 3),
+        'p99_ms': round(percentile(durations, 99), 3),
+        'max_ms': round(max(durations), 3),
+        'queries': max(query_counts),
+    }
+
+
+def measure(action, iterations, setup=None, warmup=1):
+    """
+    Run action() iterations times and summarize its latency and query count.
+
+    setup(), when given, runs untimed before every call and its return value
+    is passed to action().
+    """
+    durations = []
+    query_counts = []
+    for run in range(warmup + iterations):
+        argument = setup() if setup else None
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = action(argument) if setup else action()
+            elapsed = (time.perf_counter() - start) * 1000
+        status = getattr(response, 'status_code', 200)
+        if status >= 400:
+            raise RuntimeError(f'Benchmark request failed with HTTP {status}')
+        if run >= warmup:
+            durations.append(elapsed)
+            query_counts.append(len(queries))
+    return summarize(durations, query_counts)
+
+
+@contextmanager
+def benchmark_database(verbosity=0, name=None):
+    """
+    Test environment with a throwaway database for the duration of the block.
+    With `name`, a SQLite database lives in that file instead of in memory,
+    so other processes can open it too.
+    """
+    test_settings = connection.settings_dict['TEST']
+    old_test_name = test_settings.get('NAME')
+    if name is not None:
+        test_settings['NAME'] = str(name)
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+        test_settings['NAME'] = old_test_name
+
+
+def throughput(latencies, elapsed, concurrency):
+    return {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+    }
+
+
+def wsgi_throughput(paths, cookie, concurrency, requests):
+    """
+    Drive Django's WSGI handler from `concurrency` threads, as a threaded
+    WSGI server would, and report requests per second. No sockets involved.
+    """
+    application = get_wsgi_application()
+
+    def request(index):
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': paths[index % len(paths)],
+            'QUERY_STRING': '',
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'HTTP_HOST': 'testserver',
+            'HTTP_COOKIE': cookie,
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': BytesIO(),
+        }
+        statuses = []
+        start = time.perf_counter()
+        response = application(environ, lambda status, headers: statuses.append(status))
+        try:
+            b''.join(response)
+        finally:
+            response.close()
+        if not statuses[0].startswith('200'):
+            raise RuntimeError(f'Benchmark request failed with HTTP {statuses[0]}')
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(request, range(requests)))
+    return throughput(latencies, time.perf_counter() - start, concurrency)
+
+
+def asgi_throughput(paths, cookie, concurrency, requests):
+    """
+    Drive Django's ASGI handler with `concurrency` requests in flight on one
+    event loop, as a single ASGI worker would, and report requests per second.
+    """
+    application = get_asgi_application()
+
+    async def request(index, slots):
+        path = paths[index % len(paths)]
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': b'', 'root_path': '',
+            'headers': [(b'host', b'testserver'), (b'cookie', cookie.encode())],
+            'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+        }
+        received = False
+        disconnect = asyncio.Event()
+
+        async def receive():
+            nonlocal received
+            if received:
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+            received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        statuses = []
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        async with slots:
+            start = time.perf_counter()
+            try:
+                await application(scope, receive, send)
+            finally:
+                disconnect.set()
+            elapsed = (time.perf_counter() - start) * 1000
+        if statuses[0] != 200:
+            raise RuntimeError(f'Benchmark request failed with HTTP {statuses[0]}')
+        return elapsed
+
+    async def run():
+        slots = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(request(index, slots) for index in range(requests)))
+
+    start = time.perf_counter()
+    latencies = asyncio.run(run())
+    return throughput(latencies, time.perf_counter() - start, concurrency)
+
+
+def is_lock_error(error):
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def contention_worker(role, ids, duration, seed):
+    """
+    One process of sqlite_contention(). Readers load a user's accounts and
+    their latest transactions, as the dashboard does; writers edit a
+    transaction through Transaction.save(), as a formset save does.
+    """
+    rng = random.Random(seed)
+    latencies = []
+    lock_errors = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if role == 'read':
+                accounts = list(Account.objects.filter(user_id=rng.choice(ids)).order_by('-updated_at'))
+                list(Transaction.objects.filter(account__in=accounts).latest_per_account(5))
+            else:
+                tx = Transaction.objects.get(pk=rng.choice(ids))
+                tx.amount = Decimal(rng.randint(-500000, 500000)).scaleb(-2)
+                tx.save()
+        except OperationalError as error:
+            if not is_lock_error(error):
+                raise
+            lock_errors += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    connection.close()
+    return {'role': role, 'latencies': latencies, 'lock_errors': lock_errors}
+
+
+def sqlite_contention(readers, writers, duration, user_ids, transaction_ids):
+    """
+    Run reader and writer processes against the current SQLite database file
+    at the same time and report throughput, latency and lock errors by role.
+
+    Workers are forked, so they connect with the settings (pragmas,
+    transaction_mode) in effect when this is called.
+    """
+    connections.close_all()
+    tasks = [('read', user_ids, duration, index) for index in range(readers)]
+    tasks += [('write', transaction_ids, duration, readers + index) for index in range(writers)]
+    with multiprocessing.get_context('fork').Pool(len(tasks)) as pool:
+        results = pool.starmap(contention_worker, tasks)
+
+    report = {}
+    for role in ('read', 'write'):
+        processes = [result for result in results if result['role'] == role]
+        latencies = [ms for result in processes for ms in result['latencies']]
+        report[f'{role}s'] = {
+            'processes': len(processes),
+            'operations': len(latencies),
+            'per_second': round(len(latencies) / duration, 1),
+            'p50_ms': round(percentile(latencies, 50), 3) if latencies else None,
+            'p99_ms': round(percentile(latencies, 99), 3) if latencies else None,
+            'lock_errors': sum(result['lock_errors'] for result in processes),
+        }
+    return report
@@ -0,0 +1,67 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .instrumentation import current_timings
+
+CARD_HITS_KEY = 'hisab:account_card_stats:hits'
+CARD_MISSES_KEY = 'hisab:account_card_stats:misses'
+
+
+def get_cache():
+    """Cache backend used for per-user ledger data (HISAB_CACHE_ALIAS)"""
+    return caches[getattr(settings, 'HISAB_CACHE_ALIAS', 'default')]
+
+
+def overall_balance_key(user_id):
+    return f'hisab:overall_balance:{user_id}'
+
+
+def invalidate_overall_balance(*user_ids):
+    """Drop cached overall balances now and again once the transaction commits"""
+    keys = [overall_balance_key(user_id) for user_id in set(user_ids) if user_id is not None]
+    if not keys:
+        return
+    get_cache().delete_many(keys)
+    # A concurrent request may re-cache the old value before we commit
+    transaction.on_commit(lambda: get_cache().delete_many(keys))
+
+
+def account_card_key(account, updated_label):
+    """
+    Key of an account's rendered dashboard card. Everything the card shows
+    moves one of these: transaction edits touch updated_at, and the
+    "updated ... ago" label is part of the key so it never goes stale.
+    """
+    state = f'{account.updated_at.isoformat()}|{account.balance}|{account.transaction_count}|{updated_label}'
+    return f'hisab:account_card:{account.pk}:{hashlib.md5(state.encode()).hexdigest()}'
+
+
+def record_card_lookups(hits, misses):
+    """Count card cache hits/misses for this request and across the whole cache"""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.card_hits += hits
+        timings.card_misses += misses
+    cache = get_cache()
+    for key, count in ((CARD_HITS_KEY, hits), (CARD_MISSES_KEY, misses)):
+        if count and not cache.add(key, count, timeout=None):
+            try:
+                cache.incr(key, count)
+            except ValueError:
+                # Evicted between add() and incr()
+                cache.set(key, count, timeout=None)
+
+
+def card_cache_stats():
+    """Cumulative dashboard card cache hits, misses and hit rate"""
+    cache = get_cache()
+    hits, misses = cache.get(CARD_HITS_KEY, 0), cache.get(CARD_MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / lookups, 3) if lookups else None,
+    }
@@ -1,18 +1,66 @@
+from functools import cache
+
+from django.conf import settings
 from django.db.models import Sum
-from .models import Account, Transaction
+from .cache import get_cache, overall_balance_key
+from .models import Account
+from .routers import reporting
+
+
+def get_overall_balance(user_id):
+    """Sum of the user's account balances, served from the cache when possible"""
+    key = overall_balance_key(user_id)
+    total = get_cache().get(key)
+    if total is None:
+        total = Account.objects.filter(user_id=user_id).aggregate(
+            total=Sum('balance')
+        )['total'] or 0
+        get_cache().set(key, total, getattr(settings, 'HISAB_BALANCE_CACHE_TIMEOUT', 3600))
+    return total
+
+
+async def aget_overall_balance(user_id):
+    """Async counterpart of get_overall_balance()"""
+    key = overall_balance_key(user_id)
+    total = await get_cache().aget(key)
+    if total is None:
+        total = (await Account.objects.filter(user_id=user_id).aaggregate(
+            total=Sum('balance')
+        ))['total'] or 0
+        await get_cache().aset(key, total, getattr(settings, 'HISAB_BALANCE_CACHE_TIMEOUT', 3600))
+    return total
+
+
+async def aprepare_request(request, with_balance=True):
+    """
+    Load what template rendering would otherwise fetch lazily, for async views.
+
+    Rendering (context processors included) is synchronous and must not
+    touch the database from the event loop, so the user and their overall
+    balance are resolved here first.
+    """
+    request.user = user = await request.auser()
+    if with_balance and user.is_authenticated:
+        request.hisab_overall_balance = await aget_overall_balance(user.pk)
+    return user
 
 
 def overall_balance(request):
-    """Context processor to calculate overall balance for authenticated users"""
+    """Context processor exposing the user's overall balance as a lazy value"""
+    if hasattr(request, 'hisab_overall_balance'):
+        # Already resolved by an async view
+        return {
+            'overall_total': request.hisab_overall_balance
+        }
     if request.user.is_authenticated:
-        # Get all accounts for the user
-        accounts = Account.objects.filter(user=request.user)
-        
-        # Calculate overall total from all transactions
-        overall_total = Transaction.objects.filter(
-            account__user=request.user
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
+        user = request.user
+
+        # Templates call this only if they actually render overall_total
+        @cache
+        def overall_total():
+            with reporting(user):
+                return get_overall_balance(user.pk)
+
         return {
             'overall_total': overall_total
         }
@@ -0,0 +1,74 @@
+from decimal import Decimal, InvalidOperation
+
+from django import forms
+from django.core import validators
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils.functional import cached_property
+
+
+class MoneyField(models.BigIntegerField):
+    """
+    Amount stored as an integer number of minor units (paisa) and used as a
+    Decimal with `decimal_places` places in Python and forms.
+
+    SUM() and window totals over the column are exact integer arithmetic in
+    the database. Aggregates keep this field as their output_field, so their
+    results come back as Decimal as well.
+    """
+    description = 'Amount stored in minor units'
+    default_error_messages = {
+        'invalid': '“%(value)s” value must be a decimal number.',
+    }
+
+    def __init__(self, *args, max_digits=None, decimal_places=2, **kwargs):
+        self.max_digits = max_digits
+        self.decimal_places = decimal_places
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.max_digits is not None:
+            kwargs['max_digits'] = self.max_digits
+        if self.decimal_places != 2:
+            kwargs['decimal_places'] = self.decimal_places
+        return name, path, args, kwargs
+
+    @cached_property
+    def validators(self):
+        field_validators = super().validators
+        if self.max_digits is not None:
+            field_validators = [
+                *field_validators, validators.DecimalValidator(self.max_digits, self.decimal_places)
+            ]
+        return field_validators
+
+    def to_python(self, value):
+        if value is None or isinstance(value, Decimal):
+            return value
+        try:
+            # str() so floats convert to the value they print as
+            return Decimal(str(value) if isinstance(value, float) else value)
+        except (InvalidOperation, TypeError, ValueError):
+            raise ValidationError(
+                self.error_messages['invalid'], code='invalid', params={'value': value}
+            )
+
+    def get_prep_value(self, value):
+        value = models.Field.get_prep_value(self, value)
+        if value is None:
+            return None
+        return int(self.to_python(value).scaleb(self.decimal_places).to_integral_value())
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return Decimal(value).scaleb(-self.decimal_places)
+
+    def formfield(self, **kwargs):
+        return models.Field.formfield(self, **{
+            'form_class': forms.DecimalField,
+            'max_digits': self.max_digits,
+            'decimal_places': self.decimal_places,
+            **kwargs,
+        })
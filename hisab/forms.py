@@ -1,7 +1,15 @@
+import datetime
+
 from django import forms
 from django.forms import inlineformset_factory
 from .models import Account, Transaction
 
+# A statement has one period per month; this keeps the page (and the loop
+# building it) bounded
+STATEMENT_MAX_MONTHS = 120
+# The last month whose end build_statement() can still compute
+STATEMENT_LAST_DATE = datetime.date(datetime.MAXYEAR, 11, 30)
+
 class AccountForm(forms.ModelForm):
     class Meta:
         model = Account
@@ -53,6 +61,58 @@ class TransactionForm(forms.ModelForm):
             from django.utils import timezone
             self.fields['date'].initial = timezone.now().date()
 
+class TransactionImportForm(forms.Form):
+    file = forms.FileField(
+        label='CSV file',
+        help_text='Columns: description, amount, date (YYYY-MM-DD). A header row is optional.',
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,text/csv'
+        })
+    )
+
+class StatementForm(forms.Form):
+    start = forms.DateField(widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+    end = forms.DateField(widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('start'), cleaned_data.get('end')
+        if start and end and start > end:
+            raise forms.ValidationError('The start date must be on or before the end date.')
+        if end and end > STATEMENT_LAST_DATE:
+            self.add_error('end', f'Enter a date on or before {STATEMENT_LAST_DATE:%Y-%m-%d}.')
+        elif start and end and (end.year - start.year) * 12 + end.month - start.month >= STATEMENT_MAX_MONTHS:
+            raise forms.ValidationError(f'A statement can cover at most {STATEMENT_MAX_MONTHS} months.')
+        return cleaned_data
+
+class BalanceSeriesForm(forms.Form):
+    account = forms.IntegerField(required=False)
+    interval = forms.ChoiceField(
+        choices=[('day', 'Daily'), ('week', 'Weekly'), ('month', 'Monthly')], required=False
+    )
+    start = forms.DateField(required=False)
+    end = forms.DateField(required=False)
+    points = forms.IntegerField(min_value=2, required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('start'), cleaned_data.get('end')
+        if start and end and start > end:
+            raise forms.ValidationError('The start date must be on or before the end date.')
+        return cleaned_data
+
+class BalanceAsOfForm(forms.Form):
+    account = forms.IntegerField(required=False)
+    date = forms.DateField()
+
+class TransactionSearchForm(forms.Form):
+    q = forms.CharField(max_length=200, widget=forms.TextInput(attrs={
+        'class': 'form-control',
+        'placeholder': 'Search transactions',
+        'autofocus': True
+    }))
+
 # Create formset for handling multiple transactions
 TransactionFormSet = inlineformset_factory(
     Account, 
@@ -0,0 +1,197 @@
+import csv
+import hashlib
+import io
+import sqlite3
+from decimal import Decimal
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from .forms import TransactionForm
+from .models import Account, MonthlyRollup, Transaction, ledger_changed
+
+CSV_FIELDS = ('description', 'amount', 'date')
+
+# Row errors kept for reporting; later ones are only counted
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportResult:
+    """Outcome of a CSV import: counts plus the first few row errors"""
+
+    def __init__(self):
+        self.created = 0
+        self.duplicates = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line_number, message))
+
+
+def read_rows(text_file):
+    """Yield (line_number, row dict) from a CSV with an optional header row"""
+    reader = csv.reader(text_file)
+    columns = CSV_FIELDS
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        cells = [cell.strip() for cell in row]
+        if reader.line_num == 1 and set(CSV_FIELDS) <= {cell.lower() for cell in cells}:
+            columns = [cell.lower() for cell in cells]
+            continue
+        yield reader.line_num, dict(zip(columns, cells))
+
+
+class OccurrenceCounter:
+    """
+    Running count of identical rows in one import, used to number them.
+
+    The counts live in a private temporary SQLite database on disk (which
+    SQLite deletes on close) with a small page cache, so memory stays
+    bounded however many distinct rows the file has.
+    """
+    CACHE_KIB = 2048
+    # Stay below SQLite's host parameter limit
+    BATCH_SIZE = 500
+
+    def __init__(self):
+        self.db = sqlite3.connect('')
+        self.db.execute(f'PRAGMA cache_size = -{self.CACHE_KIB}')
+        self.db.execute('PRAGMA journal_mode = OFF')
+        self.db.execute('CREATE TABLE occurrences (key BLOB PRIMARY KEY, count INTEGER NOT NULL) WITHOUT ROWID')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.db.close()
+
+    def number(self, keys):
+        """Occurrence numbers (1, 2, ...) of a chunk's keys, counting every earlier chunk"""
+        distinct = list(set(keys))
+        counts = {}
+        for start in range(0, len(distinct), self.BATCH_SIZE):
+            batch = distinct[start:start + self.BATCH_SIZE]
+            counts.update(self.db.execute(
+                f'SELECT key, count FROM occurrences WHERE key IN ({", ".join("?" * len(batch))})', batch
+            ))
+        numbers = []
+        for key in keys:
+            counts[key] = counts.get(key, 0) + 1
+            numbers.append(counts[key])
+        self.db.executemany('INSERT OR REPLACE INTO occurrences VALUES (?, ?)', counts.items())
+        return numbers
+
+
+def row_content(cleaned_data):
+    """Normalised description, amount and date; rows with equal content are identical"""
+    return '\x1f'.join([
+        cleaned_data['description'],
+        str(cleaned_data['amount'].quantize(Decimal('0.01'))),
+        cleaned_data['date'].isoformat(),
+    ])
+
+
+def content_key(cleaned_data):
+    """8-byte digest identifying identical rows"""
+    return hashlib.blake2b(row_content(cleaned_data).encode('utf-8'), digest_size=8).digest()
+
+
+def row_hash(cleaned_data, occurrence):
+    """Content hash of a validated row; occurrence tells identical rows in one file apart"""
+    content = f'{row_content(cleaned_data)}\x1f{occurrence}'
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def import_transactions(account, file, chunk_size=1000, encoding='utf-8-sig'):
+    """
+    Stream a CSV of description, amount and date into account.
+
+    Rows are validated with TransactionForm and inserted with bulk_create,
+    one database transaction per chunk, so memory is bounded by chunk_size
+    rather than the file size. Rows whose content hash was already imported
+    are skipped, which makes uploading the same file again a no-op.
+    Identical rows are numbered by an OccurrenceCounter, which keeps its
+    counts on disk.
+    """
+    if not isinstance(file, io.TextIOBase):
+        file = io.TextIOWrapper(file, encoding=encoding, newline='')
+
+    result = ImportResult()
+    rows = read_rows(file)
+
+    with OccurrenceCounter() as occurrences:
+        while True:
+            consumed = 0
+            valid = []
+            for line_number, data in islice(rows, chunk_size):
+                consumed += 1
+                form = TransactionForm(data={field: data.get(field, '') for field in CSV_FIELDS})
+                if form.is_valid():
+                    valid.append(form.cleaned_data)
+                else:
+                    result.add_error(line_number, '; '.join(
+                        f'{field}: {" ".join(errors)}' for field, errors in form.errors.items()
+                    ))
+
+            numbers = occurrences.number([content_key(cleaned) for cleaned in valid])
+            chunk = [
+                Transaction(
+                    account=account,
+                    description=cleaned['description'],
+                    amount=cleaned['amount'],
+                    date=cleaned['date'],
+                    import_hash=row_hash(cleaned, occurrence),
+                )
+                for cleaned, occurrence in zip(valid, numbers)
+            ]
+            if chunk:
+                insert_chunk(account, chunk, result)
+            if consumed < chunk_size:
+                break
+
+    return result
+
+
+def existing_hashes(account, chunk):
+    """import_hash values of chunk that account already has"""
+    return set(
+        Transaction.objects.filter(
+            account=account, import_hash__in=[tx.import_hash for tx in chunk]
+        ).values_list('import_hash', flat=True)
+    )
+
+
+def insert_chunk(account, chunk, result):
+    """Insert one chunk of new transactions and update the account totals"""
+    try:
+        created = insert_new(account, chunk)
+    except IntegrityError:
+        # A concurrent import committed some of these rows after they were
+        # checked; the retry sees them and skips them as duplicates
+        for tx in chunk:
+            tx.pk = None  # Set by any batch inserted before the rollback
+        created = insert_new(account, chunk)
+    result.created += created
+    result.duplicates += len(chunk) - created
+
+
+def insert_new(account, chunk):
+    """Insert the rows of chunk not imported yet, in one transaction; returns how many"""
+    with transaction.atomic():
+        existing = existing_hashes(account, chunk)
+        new = [tx for tx in chunk if tx.import_hash not in existing]
+        if not new:
+            return 0
+
+        # bulk_create bypasses Transaction.save(), so apply the totals here
+        Transaction.objects.bulk_create(new)
+        Account.objects.filter(pk=account.pk).adjust_totals(
+            sum(tx.amount for tx in new), len(new)
+        )
+        MonthlyRollup.objects.refresh((account.pk, tx.date) for tx in new)
+        ledger_changed(account.user_id)
+        return len(new)
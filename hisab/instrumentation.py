@@ -0,0 +1,59 @@
+import time
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates, Template
+
+# Timings of the request currently being handled, set by ServerTimingMiddleware
+current_timings = ContextVar('hisab_request_timings', default=None)
+
+
+class RequestTimings:
+    """SQL and template rendering cost accumulated while handling one request"""
+
+    def __init__(self):
+        self.query_count = 0
+        self.query_ms = 0.0
+        self.template_ms = 0.0
+        # Dashboard account card cache lookups
+        self.card_hits = 0
+        self.card_misses = 0
+
+
+def timed_execute(execute, sql, params, many, context):
+    """
+    connection.execute_wrapper hook: count and time every query against the
+    request being handled. Concurrent async requests share a connection, so
+    the request is looked up per query rather than bound to the wrapper.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.query_count += 1
+        timings.query_ms += (time.perf_counter() - start) * 1000
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timings = current_timings.get()
+        if timings is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.template_ms += (time.perf_counter() - start) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates backend that reports top-level render time to the current request"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
@@ -0,0 +1,115 @@
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from hisab.benchmarks import base_report, benchmark_database, measure, write_report
+from hisab.cache import card_cache_stats
+from hisab.seeding import LedgerSeeder
+from user.models import User
+
+
+def parse_sizes(value):
+    """'10x100,100x1000' -> [(10, 100), (100, 1000)] as (accounts, transactions per account)"""
+    try:
+        return [
+            tuple(int(part) for part in size.lower().split('x'))
+            for size in value.split(',') if size.strip()
+        ]
+    except ValueError:
+        raise CommandError(f'Invalid --sizes value: {value!r}')
+
+
+def form_post_data(form):
+    """POST data that resubmits a form with its current values"""
+    data = {}
+    for bound_field in form:
+        value = bound_field.value()
+        if value is None or value is False:
+            continue
+        data[bound_field.html_name] = 'on' if value is True else str(value)
+    return data
+
+
+def formset_post_data(formset):
+    data = form_post_data(formset.management_form)
+    for form in formset:
+        data.update(form_post_data(form))
+    return data
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the hisab views and admin changelists at several data sizes '
+        'and print latency percentiles and query counts as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='10x100,100x1000',
+            help='Comma separated ACCOUNTSxTRANSACTIONS_PER_ACCOUNT data sizes'
+        )
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        report = base_report(
+            iterations=options['iterations'],
+            sizes=[],
+        )
+
+        with benchmark_database():
+            for accounts, transactions in parse_sizes(options['sizes']):
+                self.stderr.write(f'Benchmarking {accounts} accounts x {transactions} transactions')
+                report['sizes'].append({
+                    'accounts': accounts,
+                    'transactions_per_account': transactions,
+                    'results': self.run_size(accounts, transactions, options),
+                })
+
+        write_report(self, report, options['output'])
+
+    def run_size(self, account_count, transaction_count, options):
+        call_command('flush', interactive=False, verbosity=0)
+        cache.clear()
+        iterations = options['iterations']
+
+        seeder = LedgerSeeder(seed=options['seed'])
+        user = seeder.create_users(1)[0]
+        account = seeder.create_accounts(user, account_count, transaction_count)[0]
+        admin_user = User.objects.create_superuser(email='bench-admin@example.com', password='bench')
+
+        client = Client()
+        client.force_login(user)
+        admin_client = Client()
+        admin_client.force_login(admin_user)
+
+        edit_url = reverse('edit_account', args=[account.id])
+        edit_page = client.get(edit_url)
+        edit_data = form_post_data(edit_page.context['account_form'])
+        edit_data.update(formset_post_data(edit_page.context['transaction_formset']))
+
+        def new_account():
+            return seeder.create_accounts(user, 1, transaction_count)[0]
+
+        return {
+            'dashboard': measure(lambda: client.get(reverse('hisab_dashboard')), iterations),
+            'dashboard_card_cache': card_cache_stats(),
+            'account_details': measure(
+                lambda: client.get(reverse('account_details', args=[account.id])), iterations
+            ),
+            'edit_account_post': measure(lambda: client.post(edit_url, edit_data), iterations),
+            'delete_account': measure(
+                lambda doomed: client.post(reverse('delete_account', args=[doomed.id])),
+                iterations,
+                setup=new_account,
+            ),
+            'admin_account_changelist': measure(
+                lambda: admin_client.get(reverse('admin:hisab_account_changelist')), iterations
+            ),
+            'admin_transaction_changelist': measure(
+                lambda: admin_client.get(reverse('admin:hisab_transaction_changelist')), iterations
+            ),
+        }
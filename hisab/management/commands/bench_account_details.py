@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from hisab.benchmarks import base_report, benchmark_database, measure, write_report
+from hisab.seeding import LedgerSeeder
+
+
+def parse_counts(value):
+    try:
+        return [int(count) for count in value.split(',') if count.strip()]
+    except ValueError:
+        raise CommandError(f'Invalid --page-sizes value: {value!r}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark rendering the account details page by the number of transactions '
+        'on the page and print latency percentiles and response sizes as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-sizes', default='10,50,200,500',
+            help='Comma separated numbers of transactions rendered on the page'
+        )
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        page_sizes = parse_counts(options['page_sizes'])
+        report = base_report(
+            iterations=options['iterations'],
+            page_sizes=[],
+        )
+
+        with benchmark_database():
+            seeder = LedgerSeeder(seed=options['seed'])
+            user = seeder.create_users(1)[0]
+            account = seeder.create_accounts(user, 1, max(page_sizes))[0]
+            client = Client()
+            client.force_login(user)
+            url = reverse('account_details', args=[account.id])
+
+            for page_size in page_sizes:
+                with override_settings(HISAB_TRANSACTIONS_PER_PAGE=page_size):
+                    response = client.get(url)
+                    report['page_sizes'].append({
+                        'transactions': page_size,
+                        'response_bytes': len(response.content),
+                        'render': measure(lambda: client.get(url), options['iterations']),
+                    })
+
+        write_report(self, report, options['output'])
@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import DecimalField, Sum, Value
+
+from hisab.benchmarks import base_report, benchmark_database, measure, write_report
+from hisab.models import Transaction
+from hisab.seeding import LedgerSeeder
+
+# Amounts as the DecimalField used to store them on SQLite: REAL values in a decimal column
+LEGACY_TABLE = 'bench_decimal_amount'
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare SUM() throughput and exactness of amounts stored as integer minor '
+        'units (Transaction.amount) with the same amounts stored as SQLite decimals'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts', type=int, default=100)
+        parser.add_argument('--transactions', type=int, default=1000, help='Transactions per account')
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This benchmark compares SQLite storage formats.')
+
+        report = base_report(
+            accounts=options['accounts'],
+            transactions_per_account=options['transactions'],
+            iterations=options['iterations'],
+        )
+
+        with benchmark_database():
+            seeder = LedgerSeeder(seed=options['seed'])
+            user = seeder.create_users(1)[0]
+            seeder.create_accounts(user, options['accounts'], options['transactions'])
+            with connection.cursor() as cursor:
+                cursor.execute(f'CREATE TABLE {LEGACY_TABLE} (account_id integer, amount decimal)')
+                cursor.execute(
+                    f'INSERT INTO {LEGACY_TABLE} SELECT account_id, amount / 100.0 FROM hisab_transaction'
+                )
+            report['results'] = self.run(options['iterations'])
+
+        write_report(self, report, options['output'])
+
+    def run(self, iterations):
+        amount_field = Transaction._meta.get_field('amount')
+        # What the SQLite backend does with every DecimalField aggregate
+        decimal_sum = Value(0, output_field=DecimalField(max_digits=12, decimal_places=2))
+        to_decimal = connection.ops.get_decimalfield_converter(decimal_sum)
+
+        def sums(sql, convert):
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+                return {account_id: convert(total) for account_id, total in cursor.fetchall()}
+
+        def decimal_sums():
+            return sums(
+                f'SELECT account_id, SUM(amount) FROM {LEGACY_TABLE} GROUP BY account_id',
+                lambda total: to_decimal(total, decimal_sum, connection),
+            )
+
+        def minor_unit_sums():
+            return sums(
+                'SELECT account_id, SUM(amount) FROM hisab_transaction GROUP BY account_id',
+                lambda total: amount_field.from_db_value(total, None, connection),
+            )
+
+        exact, legacy = minor_unit_sums(), decimal_sums()
+        differing = [account_id for account_id in exact if exact[account_id] != legacy[account_id]]
+        return {
+            'decimal_sum_by_account': measure(decimal_sums, iterations),
+            'minor_units_sum_by_account': measure(minor_unit_sums, iterations),
+            'orm_sum_by_account': measure(
+                lambda: list(Transaction.objects.values('account').annotate(total=Sum('amount')).order_by()),
+                iterations,
+            ),
+            'decimal_sums_differing': len(differing),
+            'max_difference': str(max(
+                (abs(exact[account_id] - legacy[account_id]) for account_id in differing), default=0
+            )),
+        }
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from hisab import async_urls
+from hisab.benchmarks import (
+    asgi_throughput, base_report, benchmark_database, wsgi_throughput, write_report,
+)
+from hisab.seeding import LedgerSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare dashboard and account details throughput of the sync views under '
+        'the WSGI handler with the async views under the ASGI handler'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts', type=int, default=20)
+        parser.add_argument('--transactions', type=int, default=200, help='Transactions per account')
+        parser.add_argument(
+            '--concurrency', default='1,8,32',
+            help='Comma separated numbers of requests in flight'
+        )
+        parser.add_argument('--requests', type=int, default=400, help='Requests per run')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options['concurrency'].split(',') if level.strip()]
+        except ValueError:
+            raise CommandError(f"Invalid --concurrency value: {options['concurrency']!r}")
+
+        report = base_report(
+            accounts=options['accounts'],
+            transactions_per_account=options['transactions'],
+            runs=[],
+        )
+
+        with benchmark_database(), override_settings(HISAB_QUERY_BUDGET_ACTION='warn'):
+            cache.clear()
+            seeder = LedgerSeeder(seed=options['seed'])
+            user = seeder.create_users(1)[0]
+            account = seeder.create_accounts(user, options['accounts'], options['transactions'])[0]
+            client = Client()
+            client.force_login(user)
+            cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+            paths = [reverse('hisab_dashboard'), reverse('account_details', args=[account.id])]
+
+            for concurrency in levels:
+                self.stderr.write(f'Concurrency {concurrency}')
+                wsgi = wsgi_throughput(paths, cookie, concurrency, options['requests'])
+                with override_settings(ROOT_URLCONF=async_urls):
+                    asgi = asgi_throughput(paths, cookie, concurrency, options['requests'])
+                report['runs'].append({'wsgi_sync_views': wsgi, 'asgi_async_views': asgi})
+
+        write_report(self, report, options['output'])
@@ -0,0 +1,70 @@
+import gzip
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from hisab.benchmarks import base_report, benchmark_database, write_report
+from hisab.seeding import LedgerSeeder
+
+ASSET_RE = re.compile(r'<(?:link[^>]+href|script[^>]+src)="([^"]+)"')
+
+
+def local_assets(html):
+    """Paths of the project's static files a page references, without the manifest hash"""
+    paths = []
+    for url in ASSET_RE.findall(html):
+        if url.startswith(settings.STATIC_URL) or url.startswith('/' + settings.STATIC_URL):
+            path = url.split(settings.STATIC_URL, 1)[1]
+            paths.append(re.sub(r'\.[0-9a-f]{12}(\.\w+)$', r'\1', path))
+    return paths
+
+
+class Command(BaseCommand):
+    help = (
+        'Print the HTML size of the main pages (raw and gzipped) and of the '
+        'static CSS/JS files they reference as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts', type=int, default=10)
+        parser.add_argument('--transactions', type=int, default=50, help='Transactions per account')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        report = base_report(
+            accounts=options['accounts'],
+            transactions_per_account=options['transactions'],
+            pages={},
+        )
+
+        with benchmark_database():
+            seeder = LedgerSeeder(seed=options['seed'])
+            user = seeder.create_users(1)[0]
+            account = seeder.create_accounts(user, options['accounts'], options['transactions'])[0]
+            anonymous, client = Client(), Client()
+            client.force_login(user)
+
+            pages = {
+                'login': (anonymous, reverse('login')),
+                'dashboard': (client, reverse('hisab_dashboard')),
+                'account_details': (client, reverse('account_details', args=[account.id])),
+                'profile': (client, reverse('profile')),
+            }
+            for name, (page_client, url) in pages.items():
+                html = page_client.get(url).content
+                assets = {}
+                for path in local_assets(html.decode()):
+                    with open(finders.find(path), 'rb') as asset:
+                        assets[path] = len(asset.read())
+                report['pages'][name] = {
+                    'html_bytes': len(html),
+                    'html_gzip_bytes': len(gzip.compress(html)),
+                    'static_assets': assets,
+                }
+
+        write_report(self, report, options['output'])
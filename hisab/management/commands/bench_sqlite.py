@@ -0,0 +1,87 @@
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+
+from hisab.benchmarks import base_report, benchmark_database, sqlite_contention, write_report
+from hisab.models import Transaction
+from hisab.seeding import LedgerSeeder
+
+# (pragmas, transaction_mode) per profile. The baseline sets journal_mode
+# explicitly because WAL, once enabled, is stored in the database file.
+PROFILES = {
+    'django_defaults': ({'journal_mode': 'DELETE'}, None),
+    'configured': (None, None),  # HISAB_SQLITE_PRAGMAS and DATABASES OPTIONS
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Run concurrent reader and writer processes against a SQLite database file, '
+        'first with Django\'s defaults and then with HISAB_SQLITE_PRAGMAS and the '
+        'configured transaction_mode, and report throughput and lock errors as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=4)
+        parser.add_argument('--accounts', type=int, default=20, help='Accounts per user')
+        parser.add_argument('--transactions', type=int, default=100, help='Transactions per account')
+        parser.add_argument('--readers', type=int, default=4, help='Reader processes')
+        parser.add_argument('--writers', type=int, default=4, help='Writer processes')
+        parser.add_argument('--duration', type=float, default=5.0, help='Seconds per profile')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('This benchmark needs a SQLite default database.')
+        if options['readers'] + options['writers'] < 1:
+            raise CommandError('Run at least one reader or writer process.')
+
+        report = base_report(
+            users=options['users'],
+            accounts_per_user=options['accounts'],
+            transactions_per_account=options['transactions'],
+            duration_s=options['duration'],
+            profiles={},
+        )
+
+        db_options = connection.settings_dict.setdefault('OPTIONS', {})
+        configured_mode = db_options.get('transaction_mode')
+        with tempfile.TemporaryDirectory() as directory, \
+                benchmark_database(name=Path(directory) / 'bench.sqlite3'):
+            seeder = LedgerSeeder(seed=options['seed'])
+            users = seeder.create_users(options['users'])
+            for user in users:
+                seeder.create_accounts(user, options['accounts'], options['transactions'])
+            transaction_ids = list(Transaction.objects.values_list('pk', flat=True))
+
+            try:
+                for name, (pragmas, mode) in PROFILES.items():
+                    if pragmas is None:
+                        pragmas, mode = getattr(settings, 'HISAB_SQLITE_PRAGMAS', {}), configured_mode
+                    self.stderr.write(f'Profile {name}')
+                    db_options['transaction_mode'] = mode
+                    with override_settings(HISAB_SQLITE_PRAGMAS=pragmas):
+                        # Reconnect so the journal mode is switched before the workers start
+                        connection.close()
+                        with connection.cursor() as cursor:
+                            cursor.execute('PRAGMA journal_mode')
+                            journal_mode = cursor.fetchone()[0]
+                        result = sqlite_contention(
+                            options['readers'], options['writers'], options['duration'],
+                            [user.pk for user in users], transaction_ids,
+                        )
+                    report['profiles'][name] = {
+                        'journal_mode': journal_mode,
+                        'transaction_mode': mode or 'DEFERRED',
+                        **result,
+                    }
+            finally:
+                db_options['transaction_mode'] = configured_mode
+                connection.close()
+
+        write_report(self, report, options['output'])
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from hisab.importers import import_transactions
+from hisab.models import Account
+
+
+class Command(BaseCommand):
+    help = 'Stream a CSV of description, amount, date into an account'
+
+    def add_arguments(self, parser):
+        parser.add_argument('account_id', type=int)
+        parser.add_argument('csv_path')
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Rows validated and inserted per database transaction'
+        )
+        parser.add_argument('--encoding', default='utf-8-sig')
+
+    def handle(self, *args, **options):
+        try:
+            account = Account.objects.get(pk=options['account_id'])
+        except Account.DoesNotExist:
+            raise CommandError(f'Account {options["account_id"]} does not exist')
+
+        with open(options['csv_path'], encoding=options['encoding'], newline='') as csv_file:
+            result = import_transactions(account, csv_file, chunk_size=options['chunk_size'])
+
+        for line_number, message in result.errors:
+            self.stderr.write(f'Line {line_number}: {message}')
+        if result.error_count > len(result.errors):
+            self.stderr.write(f'... and {result.error_count - len(result.errors)} more errors')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result.created} transactions into "{account.name}" '
+            f'({result.duplicates} duplicates skipped, {result.error_count} errors)'
+        ))
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from hisab.models import Account
+
+
+class Command(BaseCommand):
+    help = 'Remove accounts hidden by delete_account, and their transactions, in bounded chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=getattr(settings, 'HISAB_PURGE_CHUNK_SIZE', 5000),
+            help='Transactions deleted per DELETE statement'
+        )
+        parser.add_argument(
+            '--limit', type=int,
+            help='Purge at most this many accounts (default: all waiting accounts)'
+        )
+
+    def handle(self, *args, **options):
+        accounts = Account.all_objects.filter(purge_requested_at__isnull=False).order_by('purge_requested_at')
+        if options['limit']:
+            accounts = accounts[:options['limit']]
+
+        purged = transactions = 0
+        # Loaded up front: the cursor must not stay open while rows are deleted
+        for account in list(accounts):
+            transactions += account.purge(options['chunk_size'])
+            purged += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} accounts and {transactions} transactions'))
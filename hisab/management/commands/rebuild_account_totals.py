@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from hisab.models import Account
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored balance and transaction_count of every account'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'account_ids', nargs='*', type=int,
+            help='Only rebuild these accounts (default: all accounts)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of accounts updated per database transaction'
+        )
+
+    def handle(self, *args, **options):
+        accounts = Account.objects.order_by('pk')
+        if options['account_ids']:
+            accounts = accounts.filter(pk__in=options['account_ids'])
+
+        batch_size = options['batch_size']
+        last_pk = 0
+        updated = 0
+        while True:
+            batch = list(accounts.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                break
+            with transaction.atomic():
+                updated += Account.objects.filter(pk__in=batch).rebuild_totals()
+            last_pk = batch[-1]
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt totals for {updated} accounts'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from hisab.search import FTS_TABLE, FTS_TRIGGERS
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text index of transaction descriptions from the Transaction table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--optimize', action='store_true',
+            help='Merge the index b-trees after rebuilding, for faster queries'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('The full-text index is only used on SQLite.')
+
+        with connection.cursor() as cursor:
+            # Restore sync triggers lost to a table rebuild, if any
+            for sql in FTS_TRIGGERS:
+                cursor.execute(sql)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+            if options['optimize']:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+            cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}')
+            indexed = cursor.fetchone()[0]
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} transactions'))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from hisab.seeding import LedgerSeeder
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic users, accounts and transactions with bulk_create'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1)
+        parser.add_argument('--accounts-per-user', type=int, default=10)
+        parser.add_argument('--transactions-per-account', type=int, default=100)
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Rows per bulk_create call'
+        )
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for repeatable data')
+        parser.add_argument(
+            '--password', default='bench-password',
+            help='Password set on every generated user'
+        )
+
+    def handle(self, *args, **options):
+        seeder = LedgerSeeder(
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            password=options['password'],
+        )
+        users = seeder.create_users(options['users'])
+        for user in users:
+            seeder.create_accounts(
+                user, options['accounts_per_user'], options['transactions_per_account']
+            )
+            self.stdout.write(
+                f'{seeder.account_total} accounts, {seeder.transaction_total} transactions', ending='\r'
+            )
+
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(users)} users, {seeder.account_total} accounts and '
+            f'{seeder.transaction_total} transactions (run {seeder.run})'
+        ))
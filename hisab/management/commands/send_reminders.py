@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from hisab.reminders import send_reminders
+
+
+class Command(BaseCommand):
+    help = 'Email a balance reminder to every account whose reminder is due'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Accounts loaded, emailed and rescheduled per batch'
+        )
+
+    def handle(self, *args, **options):
+        run = send_reminders(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Sent {run.sent} reminders'))
+        if run.failed:
+            self.stderr.write(f'{len(run.failed)} reminders failed and stay due: {run.failed[:20]}')
@@ -0,0 +1,104 @@
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from .instrumentation import RequestTimings, current_timings, timed_execute
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """A request ran more SQL queries than its configured budget allows"""
+
+
+def instrument_connections():
+    """Install timed_execute, once, on every database connection of the current thread"""
+    for connection in connections.all():
+        if timed_execute not in connection.execute_wrappers:
+            # First, so execute_wrapper() blocks that push and pop around it never remove it
+            connection.execute_wrappers.insert(0, timed_execute)
+
+
+class ServerTimingMiddleware:
+    """
+    Count and time every SQL query and template render of a request, emit
+    them as a Server-Timing header and check the per-URL query budget.
+
+    Budgets are keyed by URL name (namespaced, e.g. 'admin:hisab_account_changelist')
+    in HISAB_QUERY_BUDGETS, falling back to HISAB_DEFAULT_QUERY_BUDGET.
+    HISAB_QUERY_BUDGET_ACTION is 'warn' (log) or 'raise'. Budgets are only
+    checked with HISAB_QUERY_BUDGETS_ENFORCED, and the header is only sent
+    with HISAB_SERVER_TIMING; both default to DEBUG.
+
+    Works in both sync and async chains, so it does not force async views
+    back onto a worker thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        instrument_connections()
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, start)
+
+    async def __acall__(self, request):
+        # Connections are per thread: instrument the ones the async ORM will use
+        await sync_to_async(instrument_connections)()
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        return self.finish(request, response, timings, start)
+
+    def finish(self, request, response, timings, start):
+        total_ms = (time.perf_counter() - start) * 1000
+        if getattr(settings, 'HISAB_SERVER_TIMING', False):
+            metrics = [
+                f'db;dur={timings.query_ms:.1f};desc="{timings.query_count} queries"',
+                f'tpl;dur={timings.template_ms:.1f};desc="Template render"',
+                f'total;dur={total_ms:.1f}',
+            ]
+            if timings.card_hits or timings.card_misses:
+                metrics.append(f'cards;desc="{timings.card_hits} hits, {timings.card_misses} misses"')
+            response['Server-Timing'] = ', '.join(metrics)
+
+        self.check_budget(request, timings)
+        return response
+
+    def check_budget(self, request, timings):
+        if request.resolver_match is None or not getattr(settings, 'HISAB_QUERY_BUDGETS_ENFORCED', False):
+            return
+        view_name = request.resolver_match.view_name
+        budget = getattr(settings, 'HISAB_QUERY_BUDGETS', {}).get(
+            view_name, getattr(settings, 'HISAB_DEFAULT_QUERY_BUDGET', None)
+        )
+        if budget is None or timings.query_count <= budget:
+            return
+
+        message = (
+            f'{request.method} {request.path} ({view_name}) ran '
+            f'{timings.query_count} queries, budget is {budget}'
+        )
+        if getattr(settings, 'HISAB_QUERY_BUDGET_ACTION', 'warn') == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
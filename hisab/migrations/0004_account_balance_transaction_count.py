@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:24
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_totals(apps, schema_editor):
+    Account = apps.get_model('hisab', 'Account')
+    Transaction = apps.get_model('hisab', 'Transaction')
+    db_alias = schema_editor.connection.alias
+    totals = Transaction.objects.using(db_alias).filter(account=OuterRef('pk')).order_by().values('account')
+    Account.objects.using(db_alias).update(
+        balance=Coalesce(
+            Subquery(totals.annotate(total=Sum('amount')).values('total')),
+            Value(0),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        ),
+        transaction_count=Coalesce(
+            Subquery(totals.annotate(count=Count('pk')).values('count')),
+            Value(0),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hisab', '0003_alter_transaction_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='balance',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='account',
+            name='transaction_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
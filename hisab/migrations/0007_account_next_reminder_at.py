@@ -0,0 +1,40 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:36
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+# Close enough for a one-off first schedule; later ones use calendar months
+INTERVAL_DAYS = {'DA': 1, 'WE': 7, 'MO': 30, 'YE': 365}
+
+
+def schedule_existing_accounts(apps, schema_editor):
+    Account = apps.get_model('hisab', 'Account')
+    now = timezone.now()
+    for interval, days in INTERVAL_DAYS.items():
+        Account.objects.using(schema_editor.connection.alias).filter(reminder_interval=interval).update(
+            next_reminder_at=now + datetime.timedelta(days=days)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hisab', '0006_ledger_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='next_reminder_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(fields=['next_reminder_at'], name='account_next_reminder_idx'),
+        ),
+        migrations.RunPython(schedule_existing_accounts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_rollups(apps, schema_editor):
+    MonthlyRollup = apps.get_model('hisab', 'MonthlyRollup')
+    Transaction = apps.get_model('hisab', 'Transaction')
+    rows = (
+        Transaction.objects.using(schema_editor.connection.alias).order_by()
+        .annotate(month=TruncMonth('date'))
+        .values('account_id', 'month')
+        .annotate(total=Sum('amount'), count=Count('pk'), first_date=Min('date'), last_date=Max('date'))
+    )
+    MonthlyRollup.objects.using(schema_editor.connection.alias).bulk_create(
+        (MonthlyRollup(**row) for row in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hisab', '0007_account_next_reminder_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField()),
+                ('total', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('count', models.PositiveIntegerField()),
+                ('first_date', models.DateField()),
+                ('last_date', models.DateField()),
+                ('account', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_rollups', to='hisab.account')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('account', 'month'), name='unique_rollup_per_account_month')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
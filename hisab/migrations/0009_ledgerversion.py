@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_versions(apps, schema_editor):
+    """Start every user with a ledger at version 1 so their pages are cacheable right away"""
+    LedgerVersion = apps.get_model('hisab', 'LedgerVersion')
+    Account = apps.get_model('hisab', 'Account')
+    now = timezone.now()
+    db_alias = schema_editor.connection.alias
+    user_ids = Account.objects.using(db_alias).order_by().values_list('user_id', flat=True).distinct()
+    LedgerVersion.objects.using(db_alias).bulk_create(
+        (LedgerVersion(user_id=user_id, version=1, modified_at=now) for user_id in user_ids.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hisab', '0008_monthlyrollup'),
+        ('user', '0003_alter_user_mobile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ledger_version', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('modified_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(backfill_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hisab', '0010_transaction_fts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='account',
+            name='purge_requested_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='account',
+            index=models.Index(condition=models.Q(('purge_requested_at__isnull', False)), fields=['purge_requested_at'], name='account_purge_requested_idx'),
+        ),
+    ]
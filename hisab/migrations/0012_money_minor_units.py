@@ -0,0 +1,110 @@
+from django.db import migrations, models
+from django.db.models import BigIntegerField, ExpressionWrapper, F, Value
+from django.db.models.functions import Cast, Round
+
+import hisab.fields
+
+FTS_TABLE = 'hisab_transaction_fts'
+
+# The triggers of 0010_transaction_fts, which SQLite drops along with the table
+# whenever a field change rebuilds hisab_transaction
+FTS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON hisab_transaction BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON hisab_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description)
+        VALUES ('delete', old.id, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF description ON hisab_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description)
+        VALUES ('delete', old.id, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+]
+
+# (model, field, max_digits, extra field options) of every stored amount
+MONEY_FIELDS = [
+    ('transaction', 'amount', 10, {}),
+    ('account', 'balance', 12, {'default': 0, 'editable': False}),
+    ('monthlyrollup', 'total', 12, {}),
+]
+
+
+def to_minor_units(apps, schema_editor):
+    """One UPDATE per table: amount_minor = ROUND(amount * 100)"""
+    for model_name, field, max_digits, options in MONEY_FIELDS:
+        model = apps.get_model('hisab', model_name)
+        model._base_manager.using(schema_editor.connection.alias).update(**{
+            f'{field}_minor': Cast(Round(F(field) * 100), BigIntegerField()),
+        })
+
+
+def from_minor_units(apps, schema_editor):
+    for model_name, field, max_digits, options in MONEY_FIELDS:
+        model = apps.get_model('hisab', model_name)
+        model._base_manager.using(schema_editor.connection.alias).update(**{
+            # Float division: integer / integer truncates on SQLite
+            field: ExpressionWrapper(
+                F(f'{field}_minor') / Value(100.0),
+                output_field=models.DecimalField(max_digits=max_digits, decimal_places=2),
+            ),
+        })
+
+
+def create_fts_triggers(apps, schema_editor):
+    """Rebuilding hisab_transaction on SQLite drops the full-text index triggers"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in FTS_TRIGGERS:
+        schema_editor.execute(sql)
+
+
+def steps(model_name, field, max_digits, options):
+    minor = f'{field}_minor'
+    return [
+        # Nullable on the way back, so the Decimal column can be re-added to existing rows
+        migrations.AlterField(
+            model_name=model_name, name=field,
+            field=models.DecimalField(max_digits=max_digits, decimal_places=2, null=True, **options),
+        ),
+        migrations.AddField(
+            model_name=model_name, name=minor,
+            field=hisab.fields.MoneyField(max_digits=max_digits, null=True, **options),
+        ),
+    ], [
+        migrations.RemoveField(model_name=model_name, name=field),
+        migrations.RenameField(model_name=model_name, old_name=minor, new_name=field),
+        migrations.AlterField(
+            model_name=model_name, name=field,
+            field=hisab.fields.MoneyField(max_digits=max_digits, **options),
+        ),
+    ]
+
+
+before_copy, after_copy = [], []
+for spec in MONEY_FIELDS:
+    before, after = steps(*spec)
+    before_copy += before
+    after_copy += after
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hisab', '0011_account_purge_requested_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, create_fts_triggers),
+        *before_copy,
+        migrations.RunPython(to_minor_units, from_minor_units),
+        *after_copy,
+        migrations.RunPython(create_fts_triggers, migrations.RunPython.noop),
+    ]
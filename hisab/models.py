@@ -1,7 +1,16 @@
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models import (
+    Count, F, Max, Min, OuterRef, Q, Subquery, Sum, Value, Window,
+)
+from django.db.models.functions import Coalesce, RowNumber, TruncMonth
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+import calendar
 import datetime
+from .cache import invalidate_overall_balance
+from .fields import MoneyField
+from .routers import pin_to_primary
 User = get_user_model()
 
 DAILY = 'DA'
@@ -16,17 +25,420 @@ REMINDER_INTERVAL_CHOICES = [
     (YEARLY, 'Yearly'),
 ]
 
+
+def add_months(value, months):
+    """Shift a date/datetime by whole months, clamping to the last day of the month"""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    last_day = calendar.monthrange(year, month)[1]
+    return value.replace(year=year, month=month, day=min(value.day, last_day))
+
+
+def month_start(value):
+    return value.replace(day=1)
+
+
+def next_reminder_after(moment, interval):
+    """When the next reminder is due for an account reminded every `interval`"""
+    if interval == DAILY:
+        return moment + datetime.timedelta(days=1)
+    if interval == WEEKLY:
+        return moment + datetime.timedelta(weeks=1)
+    if interval == YEARLY:
+        return add_months(moment, 12)
+    return add_months(moment, 1)
+
+
+def ledger_changed(*user_ids):
+    """Record a change to these users' accounts or transactions"""
+    invalidate_overall_balance(*user_ids)
+    LedgerVersion.objects.bump(*user_ids)
+
+
+class AccountQuerySet(models.QuerySet):
+    def adjust_totals(self, amount_delta, count_delta=0):
+        """Apply a balance/count delta to the stored totals in one UPDATE"""
+        return self.update(
+            # Typed so the delta is converted to minor units like the column
+            balance=F('balance') + Value(amount_delta, output_field=MoneyField()),
+            transaction_count=F('transaction_count') + count_delta,
+            updated_at=timezone.now(),
+        )
+
+    def touch(self):
+        """Mark accounts as updated by an edit that leaves their totals alone"""
+        return self.update(updated_at=timezone.now())
+
+    def rebuild_totals(self):
+        """Recompute stored totals from the Transaction table"""
+        ledger_changed(*self.order_by().values_list('user_id', flat=True).distinct())
+        totals = Transaction.objects.filter(account=OuterRef('pk')).order_by().values('account')
+        return self.update(
+            balance=Coalesce(
+                Subquery(totals.annotate(total=Sum('amount')).values('total')),
+                Value(0),
+                output_field=MoneyField(),
+            ),
+            transaction_count=Coalesce(
+                Subquery(totals.annotate(count=Count('pk')).values('count')),
+                Value(0),
+            ),
+        )
+
+    def delete(self):
+        ledger_changed(*self.order_by().values_list('user_id', flat=True).distinct())
+        return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class AccountManager(models.Manager.from_queryset(AccountQuerySet)):
+    """Accounts in use: those waiting for purge_deleted_accounts are hidden"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(purge_requested_at__isnull=True)
+
+
 class Account(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     name = models.CharField(max_length=100)
     email = models.EmailField(unique=True)
     mobile = models.CharField(max_length=11, blank=True, null=True)
     reminder_interval = models.CharField(max_length=2, choices=REMINDER_INTERVAL_CHOICES, default=MONTHLY)
+    # Maintained from reminder_interval; the send_reminders command picks up due accounts
+    next_reminder_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Running totals maintained by Transaction.save()/delete()
+    balance = MoneyField(max_digits=12, default=0, editable=False)
+    transaction_count = models.PositiveIntegerField(default=0, editable=False)
+    # Set when a large account is deleted: hidden at once, removed by purge_deleted_accounts
+    purge_requested_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = AccountManager()
+    # Including accounts waiting to be purged
+    all_objects = AccountQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Dashboard: a user's accounts, most recently updated first
+            models.Index(fields=['user', '-updated_at'], name='account_user_updated_idx'),
+            # Reminder dispatch: due accounts in (next_reminder_at, id) order
+            models.Index(fields=['next_reminder_at'], name='account_next_reminder_idx'),
+            # Purge job: only the few accounts waiting to be purged are indexed
+            models.Index(
+                fields=['purge_requested_at'], name='account_purge_requested_idx',
+                condition=Q(purge_requested_at__isnull=False),
+            ),
+        ]
+
+    # Written with targeted UPDATEs, never from a (possibly stale) instance
+    MANAGED_FIELDS = ('balance', 'transaction_count', 'next_reminder_at', 'purge_requested_at')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_reminder_interval = instance.__dict__.get('reminder_interval')
+        instance._loaded_user_id = instance.__dict__.get('user_id')
+        return instance
+
+    def save(self, *args, **kwargs):
+        # (Re)schedule reminders for new accounts and when the interval changes
+        reschedule = self.next_reminder_at is None or (
+            getattr(self, '_loaded_reminder_interval', None) not in (None, self.reminder_interval)
+        )
+        if reschedule:
+            self.next_reminder_at = next_reminder_after(timezone.now(), self.reminder_interval)
+            self._loaded_reminder_interval = self.reminder_interval
+        # Never write back stale in-memory totals over the maintained ones
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.MANAGED_FIELDS
+            ]
+            if reschedule:
+                kwargs['update_fields'].append('next_reminder_at')
+        super().save(*args, **kwargs)
+        # Moving the account to another user (admin) changes both users' ledgers
+        ledger_changed(self.user_id, getattr(self, '_loaded_user_id', None))
+        self._loaded_user_id = self.user_id
+
+    def delete(self, *args, **kwargs):
+        ledger_changed(self.user_id)
+        return super().delete(*args, **kwargs)
+
+    def clean(self):
+        super().clean()
+        # Unique checks only see accounts in use; deleted ones keep their address until purged
+        held = Account.all_objects.filter(email=self.email, purge_requested_at__isnull=False)
+        if self.email and held.exclude(pk=self.pk).exists():
+            raise ValidationError({
+                'email': 'An account with this email is still being deleted. Try again later.',
+            })
+
+    def request_purge(self):
+        """Hide the account right away and leave its removal to purge_deleted_accounts"""
+        self.purge_requested_at = timezone.now()
+        Account.all_objects.filter(pk=self.pk).update(purge_requested_at=self.purge_requested_at)
+        ledger_changed(self.user_id)
+
+    request_purge.alters_data = True
+
+    def purge(self, chunk_size=5000):
+        """
+        Delete the account after removing its transactions chunk_size at a
+        time, so no single statement holds the write lock for long and no
+        Transaction instances are loaded. Returns the transactions deleted.
+
+        The account is hidden first: should a chunk fail, it is not left
+        listed with half its transactions, and purge_deleted_accounts
+        finishes the job.
+        """
+        if self.purge_requested_at is None:
+            self.request_purge()
+        deleted = Transaction.objects.filter(account_id=self.pk).purge(chunk_size)
+        self.delete()
+        return deleted
+
+    purge.alters_data = True
+
+
+class TransactionQuerySet(models.QuerySet):
+    def latest_per_account(self, limit):
+        """
+        The newest `limit` transactions of every account, in a single windowed query.
+
+        Rows come back in index order (account, then row_number) without an
+        extra ORDER BY, so SQLite can skip the temp B-tree sort.
+        """
+        return self.annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F('account_id'),
+                order_by=[F('date').desc(), F('id').desc()],
+            )
+        ).filter(row_number__lte=limit).order_by()
+
+    def delete(self):
+        """Bulk delete that keeps the affected accounts' totals in sync"""
+        with transaction.atomic(using=self.db):
+            deltas = list(
+                self.order_by().values('account', 'account__user').annotate(
+                    total=Sum('amount'), count=Count('pk')
+                )
+            )
+            months = list(
+                self.order_by().annotate(month=TruncMonth('date'))
+                .values_list('account', 'month').distinct()
+            )
+            result = super().delete()
+            for row in deltas:
+                Account.objects.filter(pk=row['account']).adjust_totals(
+                    -(row['total'] or 0), -row['count']
+                )
+            MonthlyRollup.objects.refresh(months)
+            ledger_changed(*(row['account__user'] for row in deltas))
+        return result
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def purge(self, chunk_size=5000):
+        """
+        Delete the matching rows with one DELETE per chunk of primary keys,
+        leaving account totals and rollups alone: only for accounts that are
+        being deleted themselves. Returns the number of rows deleted.
+        """
+        deleted = 0
+        while True:
+            pks = list(self.order_by().values_list('pk', flat=True)[:chunk_size])
+            if not pks:
+                return deleted
+            with transaction.atomic(using=self.db):
+                # Nothing cascades from Transaction, so Django deletes without loading rows
+                deleted += models.QuerySet.delete(self.model.objects.filter(pk__in=pks))[0]
+
+    purge.alters_data = True
+    purge.queryset_only = True
+
+
 class Transaction(models.Model):
-    account = models.ForeignKey(Account, on_delete=models.CASCADE)
+    account = models.ForeignKey(Account, on_delete=models.CASCADE, db_index=False)
     description = models.CharField(max_length=255)
-    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    # Stored in paisa; a Decimal with two places in Python and forms
+    amount = MoneyField(max_digits=10)
     date = models.DateField(default=datetime.date.today)
+    # Content hash of rows created by the CSV importer, used to skip re-imports
+    import_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+
+    objects = TransactionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Ledger pages, recent transactions and exports: by account, newest first
+            models.Index(fields=['account', '-date', '-id'], name='transaction_account_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['account', 'import_hash'], name='unique_import_hash_per_account'
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        amount = self._meta.get_field('amount').to_python(self.amount)
+        date = self._meta.get_field('date').to_python(self.date)
+        with transaction.atomic():
+            previous = None
+            if self.pk and not self._state.adding:
+                previous = Transaction.objects.filter(pk=self.pk).values(
+                    'account', 'account__user', 'amount', 'date'
+                ).first()
+            super().save(*args, **kwargs)
+
+            if previous is None:
+                MonthlyRollup.objects.refresh([(self.account_id, date)])
+            elif (previous['account'], previous['amount'], previous['date']) != (self.account_id, amount, date):
+                MonthlyRollup.objects.refresh([
+                    (previous['account'], previous['date']), (self.account_id, date),
+                ])
+
+            if previous is None:
+                Account.objects.filter(pk=self.account_id).adjust_totals(amount, 1)
+            elif previous['account'] != self.account_id:
+                Account.objects.filter(pk=previous['account']).adjust_totals(-previous['amount'], -1)
+                Account.objects.filter(pk=self.account_id).adjust_totals(amount, 1)
+                ledger_changed(previous['account__user'])
+            elif previous['amount'] != amount:
+                Account.objects.filter(pk=self.account_id).adjust_totals(amount - previous['amount'])
+            else:
+                # Description/date edits leave the totals alone but still change the pages
+                Account.objects.filter(pk=self.account_id).touch()
+                LedgerVersion.objects.bump(previous['account__user'])
+                return
+            ledger_changed(self.account.user_id)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            stored = Transaction.objects.filter(pk=self.pk).values('amount', 'date').first()
+            result = super().delete(*args, **kwargs)
+            if stored is not None:
+                Account.objects.filter(pk=self.account_id).adjust_totals(-stored['amount'], -1)
+                MonthlyRollup.objects.refresh([(self.account_id, month_start(stored['date']))])
+                ledger_changed(self.account.user_id)
+        return result
+
+
+class MonthlyRollupQuerySet(models.QuerySet):
+    # (account, month) pairs per refresh query. Each pair is one more OR'ed
+    # term, and SQLite rejects expressions nested more than 1000 deep.
+    REFRESH_BATCH_SIZE = 200
+
+    def refresh(self, months):
+        """
+        Recompute the rollups of the given (account_id, first-of-month) pairs
+        from their transactions. Each month is an index range scan, so this
+        stays cheap however large the account is.
+        """
+        months = sorted({(account_id, month_start(month)) for account_id, month in months})
+        for first in range(0, len(months), self.REFRESH_BATCH_SIZE):
+            self.refresh_batch(set(months[first:first + self.REFRESH_BATCH_SIZE]))
+
+    def refresh_batch(self, months):
+        ranges = Q()
+        for account_id, month in months:
+            ranges |= Q(account_id=account_id, date__gte=month, date__lt=add_months(month, 1))
+        rollups = [
+            MonthlyRollup(**row)
+            for row in Transaction.objects.filter(ranges).order_by()
+            .annotate(month=TruncMonth('date'))
+            .values('account_id', 'month')
+            .annotate(
+                total=Sum('amount'), count=Count('pk'),
+                first_date=Min('date'), last_date=Max('date'),
+            )
+        ]
+        self.upsert(rollups)
+
+        emptied = months - {(rollup.account_id, rollup.month) for rollup in rollups}
+        if emptied:
+            stale = Q()
+            for account_id, month in emptied:
+                stale |= Q(account_id=account_id, month=month)
+            self.filter(stale).delete()
+
+    def upsert(self, rollups, batch_size=None):
+        return self.bulk_create(
+            rollups,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['account', 'month'],
+            update_fields=['total', 'count', 'first_date', 'last_date'],
+        )
+
+    def rebuild(self, account_ids):
+        """Replace the rollups of these accounts with fresh ones from the Transaction table"""
+        self.filter(account_id__in=account_ids).delete()
+        return self.bulk_create([
+            MonthlyRollup(**row)
+            for row in Transaction.objects.filter(account_id__in=account_ids).order_by()
+            .annotate(month=TruncMonth('date'))
+            .values('account_id', 'month')
+            .annotate(
+                total=Sum('amount'), count=Count('pk'),
+                first_date=Min('date'), last_date=Max('date'),
+            )
+        ])
+
+
+class MonthlyRollup(models.Model):
+    """Per account and calendar month totals, kept in step with Transaction"""
+    # Indexed by the (account, month) unique constraint
+    account = models.ForeignKey(
+        Account, on_delete=models.CASCADE, related_name='monthly_rollups', db_index=False
+    )
+    # First day of the month
+    month = models.DateField()
+    total = MoneyField(max_digits=12)
+    count = models.PositiveIntegerField()
+    first_date = models.DateField()
+    last_date = models.DateField()
+
+    objects = MonthlyRollupQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['account', 'month'], name='unique_rollup_per_account_month'),
+        ]
+
+
+class LedgerVersionQuerySet(models.QuerySet):
+    def bump(self, *user_ids):
+        """Move these users' versions forward: one UPDATE, plus an INSERT the first time"""
+        user_ids = {user_id for user_id in user_ids if user_id is not None}
+        if not user_ids:
+            return
+        # Every ledger write passes through here: read-your-writes for reporting reads
+        pin_to_primary(*user_ids)
+        now = timezone.now()
+        updated = self.filter(user_id__in=user_ids).update(version=F('version') + 1, modified_at=now)
+        if updated < len(user_ids):
+            self.bulk_create(
+                [LedgerVersion(user_id=user_id, version=1, modified_at=now) for user_id in user_ids],
+                ignore_conflicts=True,
+            )
+
+
+class LedgerVersion(models.Model):
+    """
+    Per user change marker, moved forward whenever any of the user's accounts
+    or transactions change. The ledger pages derive their ETag/Last-Modified
+    from it, so revalidating an unchanged page costs a single lookup.
+    """
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='ledger_version'
+    )
+    version = models.PositiveBigIntegerField(default=0)
+    modified_at = models.DateTimeField()
+
+    objects = LedgerVersionQuerySet.as_manager()
@@ -0,0 +1,89 @@
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Account, next_reminder_after
+
+
+@dataclass
+class ReminderRun:
+    sent: int = 0
+    failed: list = field(default_factory=list)
+
+
+def due_accounts(now):
+    """Accounts whose next reminder is due, in the order they fell due"""
+    return (
+        Account.objects.filter(next_reminder_at__lte=now)
+        .select_related('user')
+        .order_by('next_reminder_at', 'pk')
+    )
+
+
+def reminder_message(account, connection=None):
+    context = {'account': account, 'owner': account.user}
+    subject = render_to_string('hisab/email/reminder_subject.txt', context)
+    return EmailMessage(
+        subject=' '.join(subject.split()),
+        body=render_to_string('hisab/email/reminder_body.txt', context),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[account.email],
+        reply_to=[account.user.email],
+        connection=connection,
+    )
+
+
+def schedule_next(accounts, now):
+    """Move the sent accounts' next reminder one interval past `now`, one UPDATE per interval"""
+    by_interval = {}
+    for account in accounts:
+        by_interval.setdefault(account.reminder_interval, []).append(account.pk)
+    with transaction.atomic():
+        for interval, pks in by_interval.items():
+            Account.objects.filter(pk__in=pks).update(
+                next_reminder_at=next_reminder_after(now, interval)
+            )
+
+
+def send_reminders(now=None, chunk_size=500, connection=None):
+    """
+    Email every account whose reminder is due over a single mail connection.
+
+    Due accounts are read in keyset-paginated chunks and rescheduled after
+    each chunk, so an interrupted run can simply be started again: only the
+    chunk in flight can be sent twice. Accounts whose message fails are left
+    due and picked up by the next run.
+    """
+    now = now or timezone.now()
+    run = ReminderRun()
+    accounts = due_accounts(now)
+    cursor = None
+    with connection or get_connection() as mail_connection:
+        while True:
+            chunk = accounts
+            if cursor is not None:
+                chunk = chunk.filter(
+                    Q(next_reminder_at__gt=cursor[0])
+                    | Q(next_reminder_at=cursor[0], pk__gt=cursor[1])
+                )
+            chunk = list(chunk[:chunk_size])
+            if not chunk:
+                break
+            cursor = (chunk[-1].next_reminder_at, chunk[-1].pk)
+
+            sent = []
+            for account in chunk:
+                try:
+                    mail_connection.send_messages([reminder_message(account, mail_connection)])
+                except Exception:
+                    run.failed.append(account.pk)
+                else:
+                    sent.append(account)
+            schedule_next(sent, now)
+            run.sent += len(sent)
+    return run
@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+from .cache import get_cache
+
+# Database that reads go to inside reporting(); None leaves them to the default routing
+reporting_alias = ContextVar('hisab_reporting_alias', default=None)
+
+
+def configured_reporting_database():
+    """HISAB_REPORTING_DATABASE if it names a configured database, else None"""
+    alias = getattr(settings, 'HISAB_REPORTING_DATABASE', None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def primary_pin_key(user_id):
+    return f'hisab:primary_pin:{user_id}'
+
+
+def pin_to_primary(*user_ids):
+    """
+    Keep these users' reporting reads on the primary database for
+    HISAB_PRIMARY_PIN_SECONDS, so they see their own writes while the
+    reporting database catches up.
+    """
+    timeout = getattr(settings, 'HISAB_PRIMARY_PIN_SECONDS', 10)
+    if configured_reporting_database() is None or not timeout:
+        return
+    get_cache().set_many({primary_pin_key(user_id): True for user_id in user_ids}, timeout)
+
+
+def reporting_database(user=None):
+    """Alias reporting reads on behalf of `user` should use"""
+    alias = configured_reporting_database()
+    if alias is None:
+        return DEFAULT_DB_ALIAS
+    if user is not None and user.is_authenticated and get_cache().get(primary_pin_key(user.pk)):
+        return DEFAULT_DB_ALIAS
+    return alias
+
+
+@contextmanager
+def reporting(user=None):
+    """
+    Send the reads made inside the block to the reporting database (unless
+    `user` wrote recently). Writes still go to the primary. Yields the alias
+    reads will use, for querysets evaluated after the block ends.
+    """
+    alias = reporting_database(user)
+    token = reporting_alias.set(alias)
+    try:
+        yield alias
+    finally:
+        reporting_alias.reset(token)
+
+
+def reporting_view(view):
+    """View decorator running the view's reads under reporting(request.user)"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with reporting(request.user):
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReportingRouter:
+    """
+    Routes reads made inside reporting() to HISAB_REPORTING_DATABASE and
+    every write to the primary (default) database.
+    """
+
+    def db_for_read(self, model, **hints):
+        return reporting_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The reporting database is a copy of the primary
+        databases = {DEFAULT_DB_ALIAS, configured_reporting_database()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
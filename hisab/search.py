@@ -0,0 +1,101 @@
+import re
+
+from django.db import connection
+from django.db.models import F
+
+from .models import Account, Transaction
+
+# FTS5 index over Transaction.description, created by migration 0010
+FTS_TABLE = 'hisab_transaction_fts'
+
+# Keep the index in step with every write path. SQLite drops a table's triggers
+# whenever a migration rebuilds hisab_transaction, so such migrations (and
+# rebuild_search_index) run these again.
+FTS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON hisab_transaction BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON hisab_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description)
+        VALUES ('delete', old.id, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF description ON hisab_transaction BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description)
+        VALUES ('delete', old.id, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description);
+    END
+    """,
+]
+
+WORD_RE = re.compile(r'\w+')
+
+
+def match_expression(text):
+    """
+    FTS5 MATCH expression for text typed by a user: every word has to start
+    a word of the description. Only word characters are kept, so quotes and
+    FTS5 operators in the input can never produce a syntax error.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(text))
+
+
+class TransactionSearch:
+    """
+    Ranked FTS5 matches among one user's transactions, newest first within
+    equal rank. Supports count() and slicing, so a Paginator over it runs
+    two queries per page: the count and the page rows (with account_name).
+    """
+
+    def __init__(self, user, text):
+        self.user = user
+        self.expression = match_expression(text)
+
+    def from_clause(self):
+        return (
+            f'FROM {FTS_TABLE} '
+            f'JOIN {Transaction._meta.db_table} t ON t.id = {FTS_TABLE}.rowid '
+            f'JOIN {Account._meta.db_table} a ON a.id = t.account_id '
+            f'WHERE {FTS_TABLE} MATCH %s AND a.user_id = %s AND a.purge_requested_at IS NULL'
+        )
+
+    def count(self):
+        if not self.expression:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) {self.from_clause()}', [self.expression, self.user.pk])
+            return cursor.fetchone()[0]
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step is not None:
+            raise TypeError('TransactionSearch only supports [start:stop] slicing')
+        start, stop = index.start or 0, index.stop
+        if not self.expression or (stop is not None and stop <= start):
+            return []
+        return list(Transaction.objects.raw(
+            f'SELECT t.*, a.name AS account_name {self.from_clause()} '
+            f'ORDER BY {FTS_TABLE}.rank, t.date DESC, t.id DESC LIMIT %s OFFSET %s',
+            [self.expression, self.user.pk, -1 if stop is None else stop - start, start],
+        ))
+
+
+def search_transactions(user, text):
+    """
+    The user's transactions whose description matches `text`, best match
+    first. Outside SQLite there is no FTS5 index, so this falls back to a
+    substring match on every word.
+    """
+    if connection.vendor == 'sqlite':
+        return TransactionSearch(user, text)
+
+    words = WORD_RE.findall(text)
+    if not words:
+        return Transaction.objects.none()
+    matches = Transaction.objects.filter(account__user=user, account__purge_requested_at__isnull=True)
+    for word in words:
+        matches = matches.filter(description__icontains=word)
+    return matches.annotate(account_name=F('account__name')).order_by('-date', '-id')
@@ -0,0 +1,103 @@
+import datetime
+import random
+import uuid
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .models import REMINDER_INTERVAL_CHOICES, Account, MonthlyRollup, Transaction, ledger_changed
+from user.models import User
+
+DESCRIPTIONS = (
+    'Rent', 'Groceries', 'Tea stall', 'Loan', 'Loan repayment', 'Salary advance',
+    'Electricity bill', 'Mobile recharge', 'Rickshaw fare', 'Medicine', 'Gift', 'Fuel',
+)
+
+# Generated dates spread over the last three years
+DATE_RANGE_DAYS = 3 * 365
+
+
+class LedgerSeeder:
+    """Generates synthetic users, accounts and transactions with bulk_create"""
+
+    def __init__(self, seed=None, batch_size=5000, password='bench-password'):
+        self.rng = random.Random(seed)
+        self.run = uuid.uuid4().hex[:8]
+        self.batch_size = batch_size
+        self.password = make_password(password)
+        self.start_date = datetime.date.today() - datetime.timedelta(days=DATE_RANGE_DAYS)
+        self.account_total = 0
+        self.transaction_total = 0
+
+    def create_users(self, count, **extra_fields):
+        offset = User.objects.count()
+        return User.objects.bulk_create(
+            [
+                User(
+                    email=f'seed-{self.run}-{offset + index}@example.com',
+                    full_name=f'Seed User {index}',
+                    mobile='01712345678',
+                    is_profile_complete=True,
+                    password=self.password,
+                    **extra_fields,
+                )
+                for index in range(count)
+            ],
+            batch_size=self.batch_size,
+        )
+
+    def create_accounts(self, user, count, transactions_per_account):
+        """Create count accounts for user, each with transactions_per_account rows"""
+        accounts = []
+        # Accounts are created in groups so one database transaction stays bounded
+        for first in range(0, count, self.batch_size):
+            with transaction.atomic():
+                group = Account.objects.bulk_create(
+                    Account(
+                        user=user,
+                        name=f'Account {first + index}',
+                        email=f'seed-{self.run}-{self.account_total + index}@example.com',
+                        reminder_interval=self.rng.choice(REMINDER_INTERVAL_CHOICES)[0],
+                        # Spread reminders from a few days overdue to a month ahead
+                        next_reminder_at=timezone.now() + datetime.timedelta(
+                            hours=self.rng.randint(-72, 30 * 24)
+                        ),
+                    )
+                    for index in range(min(self.batch_size, count - first))
+                )
+                self.account_total += len(group)
+                self.create_transactions(group, transactions_per_account)
+            accounts.extend(group)
+        return accounts
+
+    def create_transactions(self, accounts, per_account):
+        """Bulk insert per_account rows for each account and store their totals"""
+        pending = []
+        for account in accounts:
+            balance = Decimal('0')
+            for _ in range(per_account):
+                amount = Decimal(self.rng.randint(-500000, 500000)).scaleb(-2)
+                balance += amount
+                pending.append(Transaction(
+                    account=account,
+                    description=self.rng.choice(DESCRIPTIONS),
+                    amount=amount,
+                    date=self.start_date + datetime.timedelta(days=self.rng.randrange(DATE_RANGE_DAYS)),
+                ))
+                if len(pending) >= self.batch_size:
+                    self.flush(pending)
+                    pending = []
+            account.balance = balance
+            account.transaction_count = per_account
+
+        self.flush(pending)
+        Account.objects.bulk_update(accounts, ['balance', 'transaction_count'], batch_size=self.batch_size)
+        MonthlyRollup.objects.rebuild([account.pk for account in accounts])
+        ledger_changed(*{account.user_id for account in accounts})
+
+    def flush(self, pending):
+        if pending:
+            Transaction.objects.bulk_create(pending)
+            self.transaction_total += len(pending)
@@ -0,0 +1,33 @@
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+PRAGMA_VALUE_RE = re.compile(r'^-?\w+$')
+
+
+def pragma_statements(pragmas):
+    """PRAGMA statements for a {name: value} mapping, in its order"""
+    statements = []
+    for name, value in pragmas.items():
+        if not PRAGMA_VALUE_RE.match(str(name)) or not PRAGMA_VALUE_RE.match(str(value)):
+            raise ImproperlyConfigured(f'Invalid SQLite pragma in HISAB_SQLITE_PRAGMAS: {name}={value!r}')
+        statements.append(f'PRAGMA {name} = {value}')
+    return statements
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    connection_created receiver: apply HISAB_SQLITE_PRAGMAS to every new
+    SQLite connection. Pragmas are per connection (journal_mode is stored in
+    the database file), so they have to run each time one is opened.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'HISAB_SQLITE_PRAGMAS', {})
+    # WAL needs a file; in-memory databases (the test database) keep their journal
+    if connection.is_in_memory_db():
+        pragmas = {name: value for name, value in pragmas.items() if name != 'journal_mode'}
+    with connection.cursor() as cursor:
+        for statement in pragma_statements(pragmas):
+            cursor.execute(statement)
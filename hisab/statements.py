@@ -0,0 +1,87 @@
+import datetime
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+
+from .models import Transaction, add_months, month_start
+
+
+@dataclass
+class StatementPeriod:
+    start: datetime.date
+    end: datetime.date
+    total: Decimal
+    count: int
+    closing: Decimal
+
+
+@dataclass
+class Statement:
+    account: object
+    start: datetime.date
+    end: datetime.date
+    opening: Decimal = Decimal('0')
+    periods: list = field(default_factory=list)
+
+    @property
+    def total(self):
+        return sum((period.total for period in self.periods), Decimal('0'))
+
+    @property
+    def count(self):
+        return sum(period.count for period in self.periods)
+
+    @property
+    def closing(self):
+        return self.opening + self.total
+
+
+def transaction_totals(account, start, end):
+    """Sum and count of the account's raw transactions dated start..end (inclusive)"""
+    totals = Transaction.objects.filter(account=account, date__range=(start, end)).aggregate(
+        total=Sum('amount'), count=Count('pk')
+    )
+    return totals['total'] or Decimal('0'), totals['count']
+
+
+def build_statement(account, start, end):
+    """
+    Opening balance and per-month changes of an account between two dates.
+
+    Whole months come from MonthlyRollup; only the partial months at either
+    edge of the range touch the Transaction table, so the cost grows with
+    the number of months rather than the number of transactions.
+    """
+    first_month, last_month = month_start(start), month_start(end)
+    statement = Statement(account, start, end)
+
+    rollups = account.monthly_rollups.all()
+    statement.opening = rollups.filter(month__lt=first_month).aggregate(
+        total=Sum('total')
+    )['total'] or Decimal('0')
+    if start > first_month:
+        statement.opening += transaction_totals(account, first_month, start - datetime.timedelta(days=1))[0]
+
+    by_month = {
+        rollup.month: rollup
+        for rollup in rollups.filter(month__range=(first_month, last_month))
+    }
+    balance = statement.opening
+    month = first_month
+    while month <= last_month:
+        month_end = add_months(month, 1) - datetime.timedelta(days=1)
+        period_start, period_end = max(month, start), min(month_end, end)
+        rollup = by_month.get(month)
+        if rollup is None:
+            total, count = Decimal('0'), 0
+        elif period_start > rollup.last_date or period_end < rollup.first_date:
+            total, count = Decimal('0'), 0
+        elif period_start <= rollup.first_date and period_end >= rollup.last_date:
+            total, count = rollup.total, rollup.count
+        else:
+            total, count = transaction_totals(account, period_start, period_end)
+        balance += total
+        statement.periods.append(StatementPeriod(period_start, period_end, total, count, balance))
+        month = add_months(month, 1)
+    return statement
@@ -0,0 +1,109 @@
+import gzip
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Text assets worth compressing; images and fonts are compressed already
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.map', '.svg', '.txt')
+# Smaller files do not shrink by enough to pay for the extra request header
+MIN_COMPRESS_SIZE = 256
+
+# Precompressed variants, in order of preference: (file suffix, Content-Encoding)
+ENCODINGS = [('.br', 'br'), ('.gz', 'gzip')]
+
+ONE_YEAR = 365 * 24 * 60 * 60
+
+
+def compress(data):
+    """{suffix: compressed bytes} for every available encoding that makes data smaller"""
+    variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data)
+    return {suffix: content for suffix, content in variants.items() if len(content) < len(data)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage that also writes .gz (and, with the brotli
+    package installed, .br) files next to every hashed CSS/JS file that
+    collectstatic stores. A web server (nginx gzip_static/brotli_static) or
+    serve_static() can then send them without compressing per request.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(self.hashed_files.values()):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS) or not self.exists(name):
+                continue
+            with self.open(name) as original:
+                data = original.read()
+            if len(data) < MIN_COMPRESS_SIZE:
+                continue
+            for suffix, content in compress(data).items():
+                with open(self.path(name + suffix), 'wb') as compressed:
+                    compressed.write(content)
+                yield name, name + suffix, True
+
+
+def accepts(request, encoding):
+    return re.search(rf'\b{encoding}\b', request.headers.get('Accept-Encoding', '')) is not None
+
+
+def patch_caching_headers(response, path):
+    """Vary and Cache-Control of a static file response, hashed names cached for a year"""
+    patch_vary_headers(response, ['Accept-Encoding'])
+    if path in getattr(staticfiles_storage, 'hashed_files', {}).values():
+        patch_cache_control(response, public=True, max_age=ONE_YEAR, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+@require_safe
+def serve_static(request, path):
+    """
+    Serve a collected file from STATIC_ROOT, precompressed when the client
+    accepts it. Hashed names (from the manifest) never change content and
+    are cached for a year as immutable; anything else is revalidated.
+    """
+    try:
+        full_path = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404(path)
+    if not os.path.isfile(full_path):
+        raise Http404(path)
+
+    stat = os.stat(full_path)
+    if not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        # A 304 refreshes the cached headers, so it carries the same caching ones
+        return patch_caching_headers(HttpResponseNotModified(), path)
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    served_path, content_encoding = full_path, None
+    for suffix, encoding in ENCODINGS:
+        if accepts(request, encoding) and os.path.isfile(full_path + suffix):
+            served_path, content_encoding = full_path + suffix, encoding
+            break
+
+    response = FileResponse(open(served_path, 'rb'), content_type=content_type)
+    response.headers['Last-Modified'] = http_date(stat.st_mtime)
+    if content_encoding:
+        response.headers['Content-Encoding'] = content_encoding
+    return patch_caching_headers(response, path)
@@ -1,3 +1,1733 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import gzip
+import json
+import re
+import tempfile
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+
+from django.contrib import messages
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection, connections, models
+from django.db.models import Sum
+from django.http import HttpRequest, HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from user.models import User
+from . import async_urls
+from .benchmarks import percentile
+from .cache import account_card_key, card_cache_stats
+from .context_processors import overall_balance
+from .forms import TransactionFormSet
+from .importers import OccurrenceCounter, existing_hashes, import_transactions
+from .middleware import QueryBudgetExceeded
+from .models import (
+    DAILY, MONTHLY, WEEKLY, Account, LedgerVersion, MonthlyRollup, Transaction, add_months,
+)
+from .reminders import send_reminders
+from .routers import ReportingRouter, reporting
+from .search import FTS_TABLE, match_expression, search_transactions
+from .seeding import LedgerSeeder
+from .sqlite import configure_sqlite
+from .staticfiles import serve_static
+from .statements import build_statement
+from .timeseries import balance_as_of, balance_series, downsample
+
+
+class LedgerTestMixin:
+    """Shared helpers for building users, accounts and transactions"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def make_user(self, email='owner@example.com', password='secret123'):
+        return User.objects.create_user(
+            email=email, password=password, full_name='Test Owner', mobile='01712345678'
+        )
+
+    def make_account(self, user, name='Rahim', **kwargs):
+        kwargs.setdefault('email', f'{name.lower()}-{Account.objects.count()}@example.com')
+        return Account.objects.create(user=user, name=name, **kwargs)
+
+    def make_transaction(self, account, amount, description='Entry', date=None):
+        return Transaction.objects.create(
+            account=account,
+            description=description,
+            amount=Decimal(amount),
+            date=date or datetime.date(2025, 1, 1),
+        )
+
+
+class AccountTotalsTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.account = self.make_account(self.user)
+
+    def assertTotals(self, account, balance, count):
+        account.refresh_from_db()
+        self.assertEqual(account.balance, Decimal(balance))
+        self.assertEqual(account.transaction_count, count)
+
+    def test_create_edit_delete_keep_totals_in_sync(self):
+        tx = self.make_transaction(self.account, '100.50')
+        self.make_transaction(self.account, '-20.00')
+        self.assertTotals(self.account, '80.50', 2)
+
+        tx.amount = Decimal('10.00')
+        tx.save()
+        self.assertTotals(self.account, '-10.00', 2)
+
+        tx.delete()
+        self.assertTotals(self.account, '-20.00', 1)
+
+    def test_moving_transaction_between_accounts(self):
+        other = self.make_account(self.user, name='Karim')
+        tx = self.make_transaction(self.account, '30.00')
+        tx.account = other
+        tx.save()
+        self.assertTotals(self.account, '0', 0)
+        self.assertTotals(other, '30.00', 1)
+
+    def test_queryset_delete_updates_totals(self):
+        for amount in ('5.00', '7.00', '11.00'):
+            self.make_transaction(self.account, amount)
+        Transaction.objects.filter(amount__lt=10).delete()
+        self.assertTotals(self.account, '11.00', 1)
+
+    def test_account_save_does_not_overwrite_totals(self):
+        stale = Account.objects.get(pk=self.account.pk)
+        self.make_transaction(self.account, '42.00')
+        stale.name = 'Renamed'
+        stale.save()
+        self.assertTotals(self.account, '42.00', 1)
+
+    def test_formset_save_updates_totals(self):
+        existing = self.make_transaction(self.account, '10.00')
+        data = {
+            'transaction_set-TOTAL_FORMS': '2',
+            'transaction_set-INITIAL_FORMS': '1',
+            'transaction_set-0-id': str(existing.pk),
+            'transaction_set-0-description': 'Entry',
+            'transaction_set-0-amount': '15.00',
+            'transaction_set-0-date': '2025-01-01',
+            'transaction_set-1-description': 'New',
+            'transaction_set-1-amount': '5.00',
+            'transaction_set-1-date': '2025-01-02',
+        }
+        formset = TransactionFormSet(data, instance=self.account)
+        self.assertTrue(formset.is_valid(), formset.errors)
+        formset.save()
+        self.assertTotals(self.account, '20.00', 2)
+
+        data['transaction_set-0-DELETE'] = 'on'
+        data['transaction_set-TOTAL_FORMS'] = '1'
+        formset = TransactionFormSet(data, instance=self.account)
+        self.assertTrue(formset.is_valid(), formset.errors)
+        formset.save()
+        self.assertTotals(self.account, '5.00', 1)
+
+    def test_rebuild_command_backfills_totals(self):
+        self.make_transaction(self.account, '12.00')
+        self.make_transaction(self.account, '8.00')
+        Account.objects.update(balance=0, transaction_count=0)
+        call_command('rebuild_account_totals', stdout=StringIO())
+        self.assertTotals(self.account, '20.00', 2)
+
+    def test_dashboard_shows_stored_balance(self):
+        self.make_transaction(self.account, '250.00')
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('hisab_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['overall_total'], Decimal('250.00'))
+
+
+class MoneyFieldTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.account = self.make_account(self.make_user())
+
+    def test_amounts_are_stored_as_integer_paisa(self):
+        tx = self.make_transaction(self.account, '-12.34')
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT amount, typeof(amount) FROM hisab_transaction WHERE id = %s', [tx.pk])
+            self.assertEqual(cursor.fetchone(), (-1234, 'integer'))
+        tx.refresh_from_db()
+        self.assertEqual(tx.amount, Decimal('-12.34'))
+        self.assertEqual(Transaction.objects.get(amount=Decimal('-12.34')), tx)
+
+    def test_sums_are_exact(self):
+        # 0.1 + 0.2 style amounts that drift when summed as floating point
+        for _ in range(10):
+            self.make_transaction(self.account, '0.10')
+            self.make_transaction(self.account, '0.20')
+        total = Transaction.objects.aggregate(total=Sum('amount'))['total']
+        self.assertEqual(total, Decimal('3.00'))
+        self.assertIsInstance(total, Decimal)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('3.00'))
+
+    def test_form_still_validates_digits(self):
+        form = TransactionFormSet.form(data={
+            'description': 'Too precise', 'amount': '1.005', 'date': '2025-01-01',
+        })
+        self.assertIn('amount', form.errors)
+        form = TransactionFormSet.form(data={
+            'description': 'Too large', 'amount': '123456789.00', 'date': '2025-01-01',
+        })
+        self.assertIn('amount', form.errors)
+
+
+class DashboardQueryCountTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.client.force_login(self.user)
+
+    def seed_accounts(self, count):
+        Account.objects.bulk_create(
+            Account(user=self.user, name=f'Account {i}', email=f'acc{i}@example.com')
+            for i in range(Account.objects.count(), count)
+        )
+        accounts = list(Account.objects.filter(user=self.user))
+        for account in accounts[:10]:
+            for day in range(1, 8):
+                self.make_transaction(account, '10.00', date=datetime.date(2025, 1, day))
+
+    def test_query_count_does_not_grow_with_accounts(self):
+        # session, user, ledger version, accounts, recent transactions
+        for count in (1, 50, 500):
+            with self.subTest(accounts=count):
+                self.seed_accounts(count)
+                with self.assertNumQueries(5):
+                    response = self.client.get(reverse('hisab_dashboard'))
+                self.assertEqual(len(response.context['accounts_data']), count)
+
+    def test_recent_transactions_are_latest_five(self):
+        account = self.make_account(self.user)
+        for day in range(1, 9):
+            self.make_transaction(account, str(day), date=datetime.date(2025, 1, day))
+        response = self.client.get(reverse('hisab_dashboard'))
+        item = response.context['accounts_data'][0]
+        self.assertEqual(
+            [tx.date.day for tx in item['transactions']], [8, 7, 6, 5, 4]
+        )
+        self.assertEqual(item['more_count'], 3)
+        self.assertContains(response, '3 more transactions')
+
+
+class OverallBalanceContextProcessorTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.account = self.make_account(self.user)
+        self.make_transaction(self.account, '100.00')
+        self.client.force_login(self.user)
+
+    def test_total_is_cached_between_requests(self):
+        response = self.client.get(reverse('profile'))
+        self.assertContains(response, '৳100')
+        # session and user only; the balance comes from the cache
+        with self.assertNumQueries(2):
+            self.client.get(reverse('profile'))
+
+    def test_cache_invalidated_on_transaction_changes(self):
+        self.client.get(reverse('profile'))
+        tx = self.make_transaction(self.account, '50.00')
+        self.assertContains(self.client.get(reverse('profile')), '৳150')
+
+        tx.amount = Decimal('-50.00')
+        tx.save()
+        self.assertContains(self.client.get(reverse('profile')), '৳50')
+
+        Transaction.objects.filter(pk=tx.pk).delete()
+        self.assertContains(self.client.get(reverse('profile')), '৳100')
+
+    def test_cache_invalidated_on_account_delete(self):
+        self.client.get(reverse('profile'))
+        self.account.delete()
+        self.assertContains(self.client.get(reverse('profile')), '৳0')
+
+    def test_moving_an_account_invalidates_both_users(self):
+        new_owner = self.make_user(email='new-owner@example.com')
+        new_owner_client = Client()
+        new_owner_client.force_login(new_owner)
+        self.client.get(reverse('profile'))
+        new_owner_client.get(reverse('profile'))
+        versions = dict(LedgerVersion.objects.values_list('user_id', 'version'))
+
+        account = Account.objects.get(pk=self.account.pk)
+        account.user = new_owner
+        account.save()
+
+        self.assertContains(self.client.get(reverse('profile')), '৳0')
+        self.assertContains(new_owner_client.get(reverse('profile')), '৳100')
+        for user in (self.user, new_owner):
+            self.assertGreater(LedgerVersion.objects.get(user=user).version, versions.get(user.pk, 0))
+
+    def test_cache_invalidated_by_seeding(self):
+        self.client.get(reverse('profile'))
+        accounts = LedgerSeeder(seed=1).create_accounts(self.user, 2, 3)
+        total = Decimal('100.00') + sum(account.balance for account in accounts)
+        self.assertEqual(self.client.get(reverse('profile')).context['overall_total'](), total)
+
+    def test_not_computed_when_template_does_not_use_it(self):
+        request = self.client.get(reverse('profile')).wsgi_request
+        cache.clear()
+        with self.assertNumQueries(0):
+            context = overall_balance(request)
+        with self.assertNumQueries(1):
+            self.assertEqual(context['overall_total'](), Decimal('100.00'))
+            self.assertEqual(context['overall_total'](), Decimal('100.00'))
+
+
+@override_settings(HISAB_TRANSACTIONS_PER_PAGE=3)
+class AccountDetailsPaginationTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.account = self.make_account(self.user)
+        self.transactions = [
+            self.make_transaction(self.account, '10.00', f'Entry {day}', datetime.date(2025, 1, day))
+            for day in range(1, 8)
+        ]
+        self.client.force_login(self.user)
+        self.url = reverse('account_details', args=[self.account.id])
+
+    def test_only_current_page_is_bound(self):
+        response = self.client.get(self.url, {'page': 2})
+        formset = response.context['transaction_formset']
+        self.assertEqual(
+            [form.instance.date.day for form in formset.initial_forms], [4, 3, 2]
+        )
+        self.assertEqual(response.context['total'], Decimal('70.00'))
+
+    def test_each_form_is_rendered_once(self):
+        response = self.client.get(self.url)
+        for form in response.context['transaction_formset'].forms:
+            for field in ('id', 'description', 'amount', 'date'):
+                self.assertContains(response, f'name="{form.prefix}-{field}"', count=1)
+            if form.instance.pk:
+                url = reverse('update_transaction', args=[self.account.id, form.instance.pk])
+                self.assertContains(response, f'data-update-url="{url}"', count=1)
+
+    def test_saving_a_page_leaves_other_pages_untouched(self):
+        page = [self.transactions[3], self.transactions[2], self.transactions[1]]
+        data = {
+            'transaction_set-TOTAL_FORMS': '3',
+            'transaction_set-INITIAL_FORMS': '3',
+        }
+        for index, tx in enumerate(page):
+            data.update({
+                f'transaction_set-{index}-id': str(tx.pk),
+                f'transaction_set-{index}-description': tx.description,
+                f'transaction_set-{index}-amount': '20.00',
+                f'transaction_set-{index}-date': tx.date.isoformat(),
+            })
+        data['transaction_set-2-DELETE'] = 'on'
+
+        response = self.client.post(f'{self.url}?page=2', data)
+        self.assertRedirects(response, f'{self.url}?page=2')
+
+        amounts = dict(Transaction.objects.values_list('date__day', 'amount'))
+        self.assertEqual(amounts, {
+            1: Decimal('10.00'), 3: Decimal('20.00'), 4: Decimal('20.00'),
+            5: Decimal('10.00'), 6: Decimal('10.00'), 7: Decimal('10.00'),
+        })
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('80.00'))
+
+
+class CsvImportTests(LedgerTestMixin, TestCase):
+    csv_data = (
+        'description,amount,date\n'
+        'Rent,-500.00,2025-01-01\n'
+        'Tea,-20,2025-01-02\n'
+        'Tea,-20,2025-01-02\n'
+        'Broken,abc,2025-01-03\n'
+        'Salary,1000.50,2025-01-05\n'
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.account = self.make_account(self.user)
+
+    def run_import(self, data, **kwargs):
+        return import_transactions(self.account, BytesIO(data.encode('utf-8')), **kwargs)
+
+    def test_import_reports_errors_and_updates_totals(self):
+        result = self.run_import(self.csv_data, chunk_size=2)
+        self.assertEqual(result.created, 4)
+        self.assertEqual(result.error_count, 1)
+        self.assertEqual(result.errors[0][0], 5)
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('460.50'))
+        self.assertEqual(self.account.transaction_count, 4)
+
+    def test_reimport_is_idempotent(self):
+        self.run_import(self.csv_data)
+        result = self.run_import(self.csv_data, chunk_size=3)
+        self.assertEqual(result.created, 0)
+        self.assertEqual(result.duplicates, 4)
+        self.assertEqual(Transaction.objects.count(), 4)
+
+    def test_amounts_written_differently_are_the_same_row(self):
+        data = 'rent,12.5,2024-01-01\nrent,12.50,2024-01-01\n'
+        result = self.run_import(data, chunk_size=1)
+        self.assertEqual((result.created, result.error_count), (2, 0))
+        result = self.run_import(data)
+        self.assertEqual((result.created, result.duplicates), (0, 2))
+
+    def test_rows_committed_by_a_concurrent_import_are_skipped(self):
+        self.run_import(self.csv_data)
+        checks = []
+
+        def racing_check(account, chunk):
+            # The first check runs before the other upload commits
+            checks.append(chunk)
+            return set() if len(checks) == 1 else existing_hashes(account, chunk)
+
+        with mock.patch('hisab.importers.existing_hashes', racing_check):
+            result = self.run_import(self.csv_data)
+        self.assertEqual((result.created, result.duplicates), (0, 4))
+        self.account.refresh_from_db()
+        self.assertEqual(self.account.balance, Decimal('460.50'))
+        self.assertEqual(Transaction.objects.count(), 4)
+
+    def test_occurrences_are_counted_across_chunks(self):
+        with OccurrenceCounter() as occurrences:
+            self.assertEqual(occurrences.number([b'tea', b'rent', b'tea']), [1, 1, 2])
+            self.assertEqual(occurrences.number([b'tea', b'salary']), [3, 1])
+
+    def test_headerless_file(self):
+        result = self.run_import('Loan,250,2025-02-01\n')
+        self.assertEqual(result.created, 1)
+        self.assertEqual(Transaction.objects.get().description, 'Loan')
+
+    def test_upload_view(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile('ledger.csv', self.csv_data.encode('utf-8'), content_type='text/csv')
+        response = self.client.post(
+            reverse('import_transactions', args=[self.account.id]), {'file': upload}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].created, 4)
+        self.assertContains(response, 'amount: Enter a number.')
+
+    def test_upload_view_is_scoped_to_owner(self):
+        self.client.force_login(self.make_user(email='other@example.com'))
+        response = self.client.get(reverse('import_transactions', args=[self.account.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class LedgerExportTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.account = self.make_account(self.user, name='Rahim')
+        self.make_transaction(self.account, '100.00', 'Loan', datetime.date(2025, 1, 1))
+        self.make_transaction(self.account, '-30.00', 'Repay', datetime.date(2025, 1, 3))
+        self.make_transaction(self.account, '5.50', 'Tea', datetime.date(2025, 1, 2))
+        self.client.force_login(self.user)
+        self.url = reverse('export_account', args=[self.account.id])
+
+    def test_csv_export_streams_running_balance(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines, [
+            'account,date,description,amount,balance',
+            'Rahim,2025-01-01,Loan,100.00,100.00',
+            'Rahim,2025-01-02,Tea,5.50,105.50',
+            'Rahim,2025-01-03,Repay,-30.00,75.50',
+        ])
+
+    def test_json_export(self):
+        response = self.client.get(self.url, {'format': 'json'})
+        rows = json.loads(b''.join(response.streaming_content))
+        self.assertEqual([row['balance'] for row in rows], ['100.00', '105.50', '75.50'])
+
+    def test_admin_action_exports_selection(self):
+        admin_user = User.objects.create_superuser(email='admin@example.com', password='secret123')
+        self.client.force_login(admin_user)
+        response = self.client.post(reverse('admin:hisab_transaction_changelist'), {
+            'action': 'export_as_csv',
+            '_selected_action': list(Transaction.objects.values_list('pk', flat=True)),
+        })
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[-1].endswith(',75.50'))
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite specific')
+class QueryPlanTests(LedgerTestMixin, TestCase):
+    """Hot ledger queries must stay on an index: no full scans, no temp B-tree sorts"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.account = self.make_account(self.user)
+        for day in range(1, 8):
+            self.make_transaction(self.account, '10.00', date=datetime.date(2025, 1, day))
+        self.client.force_login(self.user)
+
+    def ledger_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and 'hisab_' in query['sql']
+        ]
+
+    def assertIndexedPlan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = [row[-1] for row in cursor.fetchall()]
+        for step in plan:
+            self.assertNotRegex(step, r'^SCAN hisab_', f'{sql}\n{plan}')
+            self.assertNotIn('TEMP B-TREE', step, f'{sql}\n{plan}')
+
+    def test_dashboard_queries(self):
+        queries = self.ledger_queries(reverse('hisab_dashboard'))
+        self.assertEqual(len(queries), 3)
+        for sql in queries:
+            self.assertIndexedPlan(sql)
+
+    def test_account_details_queries(self):
+        url = reverse('account_details', args=[self.account.id])
+        queries = self.ledger_queries(f'{url}?page=1')
+        self.assertGreaterEqual(len(queries), 3)
+        for sql in queries:
+            self.assertIndexedPlan(sql)
+
+    def test_context_processor_query(self):
+        queries = self.ledger_queries(reverse('profile'))
+        self.assertEqual(len(queries), 1)
+        self.assertIndexedPlan(queries[0])
+
+
+class AccountDeletionTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.account = self.make_account(self.user, name='Rahim')
+        for day in range(1, 8):
+            self.make_transaction(self.account, '10.00', f'Entry {day}', datetime.date(2025, 1, day))
+        self.kept = self.make_account(self.user, name='Karim')
+        self.make_transaction(self.kept, '1.00', 'Kept entry')
+        self.client.force_login(self.user)
+        self.url = reverse('delete_account', args=[self.account.id])
+
+    @override_settings(HISAB_PURGE_CHUNK_SIZE=3)
+    def test_small_account_is_purged_in_chunks(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertRedirects(self.client.post(self.url), reverse('hisab_dashboard'))
+        transaction_deletes = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('DELETE FROM "hisab_transaction"')
+        ]
+        # Chunks of 3, 3 and 1, then the (empty) cascade from the account
+        self.assertEqual(len(transaction_deletes), 4)
+        self.assertFalse(any(
+            query['sql'].startswith('SELECT "hisab_transaction"."id", "hisab_transaction"."account_id"')
+            for query in context.captured_queries
+        ))
+        self.assertFalse(Account.all_objects.filter(pk=self.account.pk).exists())
+        self.assertFalse(Transaction.objects.filter(account_id=self.account.pk).exists())
+        self.assertFalse(MonthlyRollup.objects.filter(account_id=self.account.pk).exists())
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    @override_settings(HISAB_INLINE_DELETE_LIMIT=5)
+    def test_large_account_is_hidden_then_purged(self):
+        self.assertRedirects(self.client.post(self.url), reverse('hisab_dashboard'))
+        self.assertEqual(Transaction.objects.filter(account_id=self.account.pk).count(), 7)
+
+        dashboard = self.client.get(reverse('hisab_dashboard'))
+        self.assertEqual([item['account'] for item in dashboard.context['accounts_data']], [self.kept])
+        self.assertEqual(dashboard.context['overall_total'], Decimal('1.00'))
+        self.assertEqual(self.client.get(reverse('account_details', args=[self.account.id])).status_code, 404)
+        self.assertEqual([tx.description for tx in search_transactions(self.user, 'entry')[:10]], ['Kept entry'])
+        tx = Transaction.objects.filter(account=self.account).first()
+        response = self.client.post(
+            reverse('delete_transaction', args=[self.account.id, tx.id])
+        )
+        self.assertEqual(response.status_code, 404)
+
+        out = StringIO()
+        call_command('purge_deleted_accounts', '--chunk-size', '2', stdout=out)
+        self.assertIn('Purged 1 accounts and 7 transactions', out.getvalue())
+        self.assertFalse(Account.all_objects.filter(pk=self.account.pk).exists())
+        self.assertEqual(Transaction.objects.count(), 1)
+
+    @override_settings(HISAB_INLINE_DELETE_LIMIT=5)
+    def test_email_is_held_until_purged(self):
+        self.client.post(self.url)
+        data = {'name': 'Again', 'email': self.account.email, 'reminder_interval': MONTHLY}
+        response = self.client.post(reverse('create_account'), data)
+        self.assertFormError(
+            response.context['account_form'], 'email',
+            'An account with this email is still being deleted. Try again later.',
+        )
+        call_command('purge_deleted_accounts', stdout=StringIO())
+        self.client.post(reverse('create_account'), data)
+        self.assertTrue(Account.objects.filter(email=self.account.email, name='Again').exists())
+
+    @override_settings(HISAB_PURGE_CHUNK_SIZE=3)
+    def test_failed_purge_leaves_account_hidden(self):
+        original_delete = models.QuerySet.delete
+        calls = []
+
+        def fail_second_chunk(queryset):
+            calls.append(queryset)
+            if len(calls) == 2:
+                raise DatabaseError('disk I/O error')
+            return original_delete(queryset)
+
+        with mock.patch.object(models.QuerySet, 'delete', fail_second_chunk):
+            with self.assertRaises(DatabaseError):
+                self.client.post(self.url)
+
+        self.assertEqual(Transaction.objects.filter(account_id=self.account.pk).count(), 4)
+        dashboard = self.client.get(reverse('hisab_dashboard'))
+        self.assertEqual([item['account'] for item in dashboard.context['accounts_data']], [self.kept])
+        call_command('purge_deleted_accounts', stdout=StringIO())
+        self.assertFalse(Account.all_objects.filter(pk=self.account.pk).exists())
+
+    @override_settings(HISAB_INLINE_DELETE_LIMIT=5)
+    def test_admin_cannot_reuse_email_held_by_deleted_account(self):
+        self.client.post(self.url)
+        self.client.force_login(User.objects.create_superuser(email='admin@example.com', password='secret123'))
+        response = self.client.post(reverse('admin:hisab_account_add'), {
+            'user': self.user.pk, 'name': 'Again', 'email': self.account.email, 'mobile': '',
+            'reminder_interval': MONTHLY,
+            'transaction_set-TOTAL_FORMS': '0', 'transaction_set-INITIAL_FORMS': '0',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(
+            response.context['adminform'].form, 'email',
+            'An account with this email is still being deleted. Try again later.',
+        )
+
+    def test_confirmation_page_does_not_count_transactions(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertContains(self.client.get(self.url), '7')
+        self.assertFalse(any('COUNT(' in query['sql'] for query in context.captured_queries))
+
+
+@skipUnless(connection.vendor == 'sqlite', 'SQLite connection settings')
+class SqliteConnectionTests(TestCase):
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_to_new_connections(self):
+        with override_settings(HISAB_SQLITE_PRAGMAS={'busy_timeout': 1234, 'cache_size': -4096}):
+            configure_sqlite(sender=None, connection=connection)
+        self.assertEqual(self.pragma('busy_timeout'), 1234)
+        self.assertEqual(self.pragma('cache_size'), -4096)
+
+    def test_invalid_pragma_is_rejected(self):
+        with override_settings(HISAB_SQLITE_PRAGMAS={'cache_size': '1; DROP TABLE hisab_account'}):
+            with self.assertRaises(ImproperlyConfigured):
+                configure_sqlite(sender=None, connection=connection)
+
+    def test_atomic_blocks_begin_immediate(self):
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+
+class SeedLedgerTests(TestCase):
+    def test_seed_creates_rows_with_consistent_totals(self):
+        call_command(
+            'seed_ledger', users=2, accounts_per_user=3, transactions_per_account=4,
+            batch_size=5, seed=7, stdout=StringIO(),
+        )
+        self.assertEqual(User.objects.count(), 2)
+        self.assertEqual(Account.objects.count(), 6)
+        self.assertEqual(Transaction.objects.count(), 24)
+
+        expected = {
+            account.pk: (account.balance, account.transaction_count)
+            for account in Account.objects.all()
+        }
+        Account.objects.rebuild_totals()
+        actual = {
+            account.pk: (account.balance, account.transaction_count)
+            for account in Account.objects.all()
+        }
+        self.assertEqual(actual, expected)
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([3.0], 90), 3.0)
+
+
+class ConditionalLedgerPageTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.account = self.make_account(self.user)
+        self.transaction = self.make_transaction(self.account, '10.00')
+        self.client.force_login(self.user)
+        self.urls = [reverse('hisab_dashboard'), reverse('account_details', args=[self.account.id])]
+
+    def version(self):
+        return LedgerVersion.objects.get(user=self.user).version
+
+    def revalidate(self, url, response):
+        return self.client.get(url, headers={'if-none-match': response['ETag']})
+
+    def test_unchanged_pages_return_304_without_rendering(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertIn('private', response['Cache-Control'])
+                # session, user, ledger version
+                with self.assertNumQueries(3):
+                    revalidated = self.revalidate(url, response)
+                self.assertEqual(revalidated.status_code, 304)
+                self.assertEqual(revalidated.content, b'')
+                self.assertIsNone(revalidated.context)
+
+    def test_if_modified_since(self):
+        response = self.client.get(self.urls[0])
+        revalidated = self.client.get(
+            self.urls[0], headers={'if-modified-since': response['Last-Modified']}
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_every_ledger_change_bumps_the_version(self):
+        other_user = self.make_user(email='other@example.com')
+        other_account = self.make_account(other_user, name='Karim')
+        def rename_transaction():
+            self.transaction.description = 'Renamed'
+            self.transaction.save()
+
+        def change_amount():
+            self.transaction.amount = Decimal('12.00')
+            self.transaction.save()
+
+        def rename_account():
+            self.account.name = 'Renamed'
+            self.account.save()
+
+        changes = {
+            'create': lambda: self.make_transaction(self.account, '5.00'),
+            'rename transaction': rename_transaction,
+            'change amount': change_amount,
+            'rename account': rename_account,
+            'bulk delete': lambda: Transaction.objects.filter(amount=Decimal('5.00')).delete(),
+            'import': lambda: import_transactions(
+                self.account, BytesIO(b'description,amount,date\nImported,3.00,2025-02-01\n')
+            ),
+            'rebuild totals': lambda: Account.objects.filter(pk=self.account.pk).rebuild_totals(),
+            'delete transaction': lambda: self.transaction.delete(),
+        }
+        for name, change in changes.items():
+            with self.subTest(change=name):
+                before, other_before = self.version(), LedgerVersion.objects.get(user=other_user).version
+                change()
+                self.assertGreater(self.version(), before)
+                self.assertEqual(LedgerVersion.objects.get(user=other_user).version, other_before)
+
+        other_before = LedgerVersion.objects.get(user=other_user).version
+        other_account.delete()
+        self.assertGreater(LedgerVersion.objects.get(user=other_user).version, other_before)
+
+    def test_changed_pages_render_again(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.make_transaction(self.account, '7.00', description='Fresh entry')
+                revalidated = self.revalidate(url, response)
+                self.assertEqual(revalidated.status_code, 200)
+                self.assertContains(revalidated, 'Fresh entry')
+                self.assertNotEqual(revalidated['ETag'], response['ETag'])
+
+    def test_profile_change_invalidates(self):
+        response = self.client.get(self.urls[0])
+        self.user.full_name = 'New Name'
+        self.user.save()
+        self.assertEqual(self.revalidate(self.urls[0], response).status_code, 200)
+
+    def test_other_users_changes_do_not_invalidate(self):
+        response = self.client.get(self.urls[0])
+        other_account = self.make_account(self.make_user(email='other@example.com'), name='Karim')
+        self.make_transaction(other_account, '1.00')
+        self.assertEqual(self.revalidate(self.urls[0], response).status_code, 304)
+
+    def test_pending_messages_are_not_revalidated(self):
+        url = self.urls[1]
+        etag = self.client.get(url)['ETag']
+        # A message queued by an earlier request must be shown, not hidden behind a 304
+        storage = CookieStorage(HttpRequest())
+        storage.add(messages.INFO, 'Heads up')
+        carrier = HttpResponse()
+        storage.update(carrier)
+        self.client.cookies['messages'] = carrier.cookies['messages'].value
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Heads up')
+
+    def test_login_again_does_not_revalidate_stale_csrf_tokens(self):
+        client = Client(enforce_csrf_checks=True)
+        url = self.urls[1]
+
+        def log_in():
+            token = client.get(reverse('login')).context['csrf_token']
+            client.post(reverse('login'), {
+                'username': self.user.email, 'password': 'secret123', 'csrfmiddlewaretoken': token,
+            })
+
+        log_in()
+        response = client.get(url)
+        client.post(reverse('logout'), {'csrfmiddlewaretoken': response.context['csrf_token']})
+        log_in()
+
+        revalidated = client.get(url, headers={'if-none-match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 200)
+        self.assertNotEqual(revalidated['ETag'], response['ETag'])
+        created = client.post(reverse('create_transaction', args=[self.account.id]), {
+            'description': 'After login', 'amount': '1.00', 'date': '2025-01-02',
+            'csrfmiddlewaretoken': revalidated.context['csrf_token'],
+        })
+        self.assertEqual(created.status_code, 201)
+
+    def test_post_is_unaffected(self):
+        response = self.client.get(self.urls[1])
+        data = {
+            'transaction_set-TOTAL_FORMS': '1',
+            'transaction_set-INITIAL_FORMS': '1',
+            'transaction_set-0-id': str(self.transaction.id),
+            'transaction_set-0-description': 'Posted',
+            'transaction_set-0-amount': '10.00',
+            'transaction_set-0-date': '2025-01-01',
+        }
+        posted = self.client.post(self.urls[1], data, headers={'if-none-match': response['ETag']})
+        self.assertEqual(posted.status_code, 302)
+        self.transaction.refresh_from_db()
+        self.assertEqual(self.transaction.description, 'Posted')
+
+
+@override_settings(HISAB_SERVER_TIMING=True)
+class DashboardCardCacheTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.accounts = [self.make_account(self.user, name=f'Account{i}') for i in range(3)]
+        for account in self.accounts:
+            self.make_transaction(account, '10.00', description=f'{account.name} entry')
+        self.client.force_login(self.user)
+        self.url = reverse('hisab_dashboard')
+
+    def cards(self, response):
+        return {item['account'].pk: item['card']['html'] for item in response.context['accounts_data']}
+
+    def test_unchanged_cards_come_from_the_cache(self):
+        first = self.client.get(self.url)
+        self.assertIn('cards;desc="0 hits, 3 misses"', first['Server-Timing'])
+        # session, user, ledger version, accounts: no recent transactions query
+        with self.assertNumQueries(4):
+            second = self.client.get(self.url)
+        self.assertIn('cards;desc="3 hits, 0 misses"', second['Server-Timing'])
+        self.assertEqual(self.cards(first), self.cards(second))
+        self.assertContains(second, 'Account0 entry')
+        self.assertEqual(card_cache_stats(), {'hits': 3, 'misses': 3, 'hit_rate': 0.5})
+
+    def test_only_changed_accounts_are_rendered_again(self):
+        first = self.cards(self.client.get(self.url))
+        changed, unchanged = self.accounts[0], self.accounts[1:]
+        self.make_transaction(changed, '5.00', description='Fresh entry')
+
+        response = self.client.get(self.url)
+        self.assertIn('cards;desc="2 hits, 1 misses"', response['Server-Timing'])
+        second = self.cards(response)
+        self.assertIn('Fresh entry', second[changed.pk])
+        for account in unchanged:
+            self.assertEqual(second[account.pk], first[account.pk])
+
+    def test_description_edit_renders_the_card_again(self):
+        self.client.get(self.url)
+        tx = Transaction.objects.get(account=self.accounts[2])
+        tx.description = 'Renamed entry'
+        tx.save()
+        response = self.client.get(self.url)
+        self.assertIn('cards;desc="2 hits, 1 misses"', response['Server-Timing'])
+        self.assertContains(response, 'Renamed entry')
+
+    def test_rebuilt_totals_render_the_card_again(self):
+        self.client.get(self.url)
+        Account.objects.filter(pk=self.accounts[0].pk).update(balance=Decimal('999.00'))
+        response = self.client.get(self.url)
+        self.assertContains(response, '999.00')
+        Account.objects.filter(pk=self.accounts[0].pk).rebuild_totals()
+        response = self.client.get(self.url)
+        self.assertNotContains(response, '999.00')
+
+    def test_updated_label_is_part_of_the_key(self):
+        account = self.accounts[0]
+        self.assertNotEqual(
+            account_card_key(account, '0\xa0minutes'), account_card_key(account, '1\xa0minute')
+        )
+
+
+@override_settings(HISAB_SERVER_TIMING=True, HISAB_QUERY_BUDGETS_ENFORCED=True)
+class ServerTimingMiddlewareTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.account = self.make_account(self.user)
+        self.client.force_login(self.user)
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('hisab_dashboard'))
+        header = response['Server-Timing']
+        self.assertRegex(header, r'db;dur=[\d.]+;desc="5 queries"')
+        self.assertRegex(header, r'tpl;dur=[\d.]+')
+        self.assertRegex(header, r'total;dur=[\d.]+')
+
+    @override_settings(HISAB_QUERY_BUDGETS={'hisab_dashboard': 2}, HISAB_QUERY_BUDGET_ACTION='raise')
+    def test_over_budget_raises(self):
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'ran 5 queries, budget is 2'):
+            self.client.get(reverse('hisab_dashboard'))
+
+    @override_settings(HISAB_QUERY_BUDGETS={'hisab_dashboard': 2})
+    def test_over_budget_warns(self):
+        with self.assertLogs('hisab.middleware', 'WARNING') as logs:
+            self.client.get(reverse('hisab_dashboard'))
+        self.assertIn('hisab_dashboard', logs.output[0])
+
+    @override_settings(HISAB_QUERY_BUDGET_ACTION='raise')
+    def test_views_stay_within_default_budgets(self):
+        for day in range(1, 8):
+            self.make_transaction(self.account, '1.00', date=datetime.date(2025, 1, day))
+        admin_user = User.objects.create_superuser(email='admin@example.com', password='secret123')
+        for url in (
+            reverse('hisab_dashboard'),
+            reverse('account_details', args=[self.account.id]),
+            reverse('edit_account', args=[self.account.id]),
+            reverse('delete_account', args=[self.account.id]),
+        ):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.client.force_login(admin_user)
+        for url in (
+            reverse('admin:hisab_account_changelist'),
+            reverse('admin:hisab_transaction_changelist'),
+        ):
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class ReminderTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.now = timezone.now()
+
+    def make_due_account(self, name, interval=MONTHLY, overdue_hours=1):
+        account = self.make_account(self.user, name=name, reminder_interval=interval)
+        Account.objects.filter(pk=account.pk).update(
+            next_reminder_at=self.now - datetime.timedelta(hours=overdue_hours)
+        )
+        return account
+
+    def test_new_account_is_scheduled_one_interval_ahead(self):
+        account = self.make_account(self.user, reminder_interval=WEEKLY)
+        self.assertAlmostEqual(
+            account.next_reminder_at, timezone.now() + datetime.timedelta(weeks=1),
+            delta=datetime.timedelta(minutes=1),
+        )
+
+    def test_interval_change_reschedules(self):
+        account = self.make_account(self.user, reminder_interval=MONTHLY)
+        account = Account.objects.get(pk=account.pk)
+        account.reminder_interval = DAILY
+        account.save()
+        account.refresh_from_db()
+        self.assertLess(account.next_reminder_at, timezone.now() + datetime.timedelta(days=2))
+
+    def test_stale_instance_save_keeps_schedule(self):
+        account = self.make_due_account('Rahim')
+        stale = Account.objects.get(pk=account.pk)
+        send_reminders(now=self.now)
+        stale.name = 'Karim'
+        stale.save()
+        stale.refresh_from_db()
+        self.assertGreater(stale.next_reminder_at, self.now)
+
+    def test_sends_due_reminders_with_balance(self):
+        due = self.make_due_account('Rahim', overdue_hours=2)
+        self.make_transaction(due, '125.50')
+        self.make_account(self.user, name='Karim')
+
+        run = send_reminders(now=self.now, chunk_size=1)
+
+        self.assertEqual(run.sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, [due.email])
+        self.assertEqual(message.reply_to, [self.user.email])
+        self.assertIn('125.50', message.subject)
+        self.assertIn('Current balance: 125.50', message.body)
+
+    def test_chunks_reuse_one_connection_and_advance_schedule(self):
+        daily = self.make_due_account('Daily', interval=DAILY, overdue_hours=3)
+        monthly = [self.make_due_account(f'Monthly{i}', overdue_hours=i) for i in range(4)]
+
+        with mock.patch('hisab.reminders.get_connection', wraps=mail.get_connection) as opened:
+            run = send_reminders(now=self.now, chunk_size=2)
+        opened.assert_called_once_with()
+
+        self.assertEqual(run.sent, 5)
+        self.assertEqual({message.to[0] for message in mail.outbox}, {
+            account.email for account in [daily, *monthly]
+        })
+        daily.refresh_from_db()
+        self.assertEqual(daily.next_reminder_at, self.now + datetime.timedelta(days=1))
+        for account in monthly:
+            account.refresh_from_db()
+            self.assertEqual(account.next_reminder_at, add_months(self.now, 1))
+
+        self.assertEqual(send_reminders(now=self.now).sent, 0)
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_failed_reminders_stay_due(self):
+        account = self.make_due_account('Rahim')
+
+        class BrokenConnection(mail.get_connection().__class__):
+            def send_messages(self, messages):
+                raise OSError('SMTP down')
+
+        run = send_reminders(now=self.now, connection=BrokenConnection())
+        self.assertEqual((run.sent, run.failed), (0, [account.pk]))
+        account.refresh_from_db()
+        self.assertLessEqual(account.next_reminder_at, self.now)
+
+    def test_management_command(self):
+        self.make_due_account('Rahim')
+        out = StringIO()
+        call_command('send_reminders', chunk_size=10, stdout=out)
+        self.assertIn('Sent 1 reminders', out.getvalue())
+        self.assertEqual(len(mail.outbox), 1)
+
+
+class MonthlyRollupTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.account = self.make_account(self.user)
+
+    def rollups(self, account=None):
+        return {
+            (rollup.month, rollup.total, rollup.count, rollup.first_date, rollup.last_date)
+            for rollup in MonthlyRollup.objects.filter(account=account or self.account)
+        }
+
+    def assertMatchesRebuild(self):
+        expected = self.rollups()
+        MonthlyRollup.objects.rebuild([self.account.pk])
+        self.assertEqual(self.rollups(), expected)
+
+    def test_bulk_delete_over_many_months(self):
+        other = self.make_account(self.user, name='Other')
+        first_month = datetime.date(1950, 1, 1)
+        Transaction.objects.bulk_create(
+            Transaction(
+                account=account, description='Old', amount=Decimal('1.00'), date=add_months(first_month, index),
+            )
+            for account in (self.account, other) for index in range(600)
+        )
+        Account.objects.filter(pk__in=[self.account.pk, other.pk]).rebuild_totals()
+        MonthlyRollup.objects.rebuild([self.account.pk, other.pk])
+        self.make_transaction(self.account, '5.00', date=datetime.date(2025, 1, 1))
+
+        Transaction.objects.filter(description='Old').delete()
+        self.assertEqual(Transaction.objects.count(), 1)
+        self.assertEqual(MonthlyRollup.objects.count(), 1)
+        self.assertMatchesRebuild()
+
+    def test_rollups_follow_transaction_changes(self):
+        jan = datetime.date(2025, 1, 1)
+        first = self.make_transaction(self.account, '100.00', date=datetime.date(2025, 1, 5))
+        self.make_transaction(self.account, '-30.00', date=datetime.date(2025, 1, 20))
+        self.assertEqual(self.rollups(), {
+            (jan, Decimal('70.00'), 2, datetime.date(2025, 1, 5), datetime.date(2025, 1, 20)),
+        })
+
+        first.date = datetime.date(2025, 2, 10)
+        first.amount = Decimal('110.00')
+        first.save()
+        self.assertEqual(self.rollups(), {
+            (jan, Decimal('-30.00'), 1, datetime.date(2025, 1, 20), datetime.date(2025, 1, 20)),
+            (datetime.date(2025, 2, 1), Decimal('110.00'), 1,
+             datetime.date(2025, 2, 10), datetime.date(2025, 2, 10)),
+        })
+        self.assertMatchesRebuild()
+
+        other = self.make_account(self.user, name='Karim')
+        first.account = other
+        first.save()
+        self.assertEqual(len(self.rollups()), 1)
+        self.assertEqual(len(self.rollups(other)), 1)
+
+        first.delete()
+        self.assertEqual(self.rollups(other), set())
+
+        Transaction.objects.filter(account=self.account).delete()
+        self.assertFalse(MonthlyRollup.objects.exists())
+
+    def test_import_updates_rollups(self):
+        import_transactions(self.account, BytesIO(
+            b'Rent,-500.00,2025-03-01\nSalary,1000.00,2025-03-28\nTea,-5.00,2025-04-02\n'
+        ))
+        self.assertEqual({(r[0], r[1], r[2]) for r in self.rollups()}, {
+            (datetime.date(2025, 3, 1), Decimal('500.00'), 2),
+            (datetime.date(2025, 4, 1), Decimal('-5.00'), 1),
+        })
+        self.assertMatchesRebuild()
+
+    def test_rebuild_command(self):
+        self.make_transaction(self.account, '10.00')
+        MonthlyRollup.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_monthly_rollups', stdout=out)
+        self.assertIn('Rebuilt 1 monthly rollups', out.getvalue())
+        self.assertEqual(MonthlyRollup.objects.get().total, Decimal('10.00'))
+
+    def test_statement_matches_raw_transactions(self):
+        for month in range(1, 13):
+            for day in (1, 15, 28):
+                self.make_transaction(
+                    self.account, f'{month * day}.00', date=datetime.date(2024, month, day)
+                )
+        start, end = datetime.date(2024, 3, 10), datetime.date(2024, 9, 20)
+
+        statement = build_statement(self.account, start, end)
+
+        def raw_sum(**filters):
+            return Transaction.objects.filter(account=self.account, **filters).aggregate(
+                total=Sum('amount')
+            )['total']
+        self.assertEqual(statement.opening, raw_sum(date__lt=start))
+        self.assertEqual(statement.total, raw_sum(date__range=(start, end)))
+        self.assertEqual(statement.closing, raw_sum(date__lte=end))
+        self.assertEqual(statement.count, 3 * 5 + 2 + 2)
+        self.assertEqual(len(statement.periods), 7)
+        self.assertEqual(statement.periods[0].start, start)
+        self.assertEqual(statement.periods[-1].end, end)
+
+    def test_statement_query_count_does_not_grow_with_transactions(self):
+        start, end = datetime.date(2024, 1, 10), datetime.date(2024, 12, 20)
+        for size in (1, 10):
+            for _ in range(size):
+                for date in ('2024-01-05', '2024-01-25', '2024-06-15', '2024-12-05', '2024-12-25'):
+                    self.make_transaction(self.account, '1.00', date=datetime.date.fromisoformat(date))
+            # Opening rollups, opening edge, month rollups, two edge months
+            with self.assertNumQueries(5):
+                build_statement(self.account, start, end)
+
+    def test_statement_view(self):
+        self.make_transaction(self.account, '42.00', date=datetime.date(2025, 1, 15))
+        self.client.force_login(self.user)
+        url = reverse('account_statement', args=[self.account.id])
+
+        response = self.client.get(url, {'start': '2025-01-01', 'end': '2025-02-28'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['statement'].closing, Decimal('42.00'))
+        self.assertEqual(len(response.context['statement'].periods), 2)
+
+        response = self.client.get(url, {'start': '2025-02-01', 'end': '2025-01-01'})
+        self.assertIsNone(response.context['statement'])
+
+    def test_statement_range_is_bounded(self):
+        self.client.force_login(self.user)
+        url = reverse('account_statement', args=[self.account.id])
+        for start, end in [('9999-12-01', '9999-12-31'), ('2000-01-01', '2025-01-01')]:
+            response = self.client.get(url, {'start': start, 'end': end})
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNone(response.context['statement'])
+
+        response = self.client.get(url, {'start': '2016-01-15', 'end': '2025-12-31'})
+        self.assertEqual(len(response.context['statement'].periods), 120)
+        response = self.client.get(url, {'start': '9999-11-01', 'end': '9999-11-30'})
+        self.assertEqual(len(response.context['statement'].periods), 1)
+
+
+class BalanceSeriesTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.first = self.make_account(self.user, name='Rahim')
+        self.second = self.make_account(self.user, name='Karim')
+        self.entries = [
+            (self.first, '100.00', datetime.date(2025, 1, 6)),
+            (self.second, '-40.00', datetime.date(2025, 1, 8)),
+            (self.first, '25.50', datetime.date(2025, 1, 20)),
+            (self.first, '-10.00', datetime.date(2025, 3, 2)),
+            (self.second, '7.25', datetime.date(2025, 3, 31)),
+        ]
+        for account, amount, date in self.entries:
+            self.make_transaction(account, amount, date=date)
+        self.client.force_login(self.user)
+
+    def replay(self, accounts, date):
+        return sum(
+            (Decimal(amount) for account, amount, day in self.entries
+             if account in accounts and day <= date),
+            Decimal('0'),
+        )
+
+    def test_series_matches_replay(self):
+        accounts = Account.objects.filter(user=self.user)
+        for interval in ('day', 'week', 'month'):
+            points = balance_series(accounts, interval)['points']
+            for point in points:
+                bucket_end = {
+                    'day': point['date'],
+                    'week': point['date'] + datetime.timedelta(days=6),
+                    'month': add_months(point['date'], 1) - datetime.timedelta(days=1),
+                }[interval]
+                self.assertEqual(
+                    point['balance'], self.replay([self.first, self.second], bucket_end), interval
+                )
+        self.assertEqual(len(balance_series(accounts, 'day')['points']), 5)
+        self.assertEqual(
+            [p['date'] for p in balance_series(accounts, 'month')['points']],
+            [datetime.date(2025, 1, 1), datetime.date(2025, 3, 1)],
+        )
+
+    def test_series_with_start_includes_opening_balance(self):
+        series = balance_series(
+            Account.objects.filter(pk=self.first.pk), 'day', start=datetime.date(2025, 2, 1)
+        )
+        self.assertEqual(series['opening'], Decimal('125.50'))
+        self.assertEqual(series['points'], [{
+            'date': datetime.date(2025, 3, 2), 'change': Decimal('-10.00'), 'balance': Decimal('115.50'),
+        }])
+
+    def test_monthly_series_stops_at_end(self):
+        accounts = Account.objects.filter(user=self.user)
+        for end in (datetime.date(2025, 1, 10), datetime.date(2025, 3, 1), datetime.date(2025, 3, 31)):
+            points = balance_series(accounts, 'month', end=end)['points']
+            self.assertEqual(points[-1]['balance'], self.replay([self.first, self.second], end), end)
+        self.assertEqual(
+            [p['date'] for p in balance_series(accounts, 'month', end=datetime.date(2025, 2, 10))['points']],
+            [datetime.date(2025, 1, 1)],
+        )
+
+    def test_downsample_keeps_exact_balances(self):
+        points = [
+            {'date': day, 'change': Decimal('1'), 'balance': Decimal(day)} for day in range(1, 11)
+        ]
+        sampled = downsample(points, 3)
+        self.assertEqual(len(sampled), 3)
+        self.assertEqual([p['balance'] for p in sampled], [Decimal(4), Decimal(8), Decimal(10)])
+        self.assertEqual(sum(p['change'] for p in sampled), Decimal(10))
+
+    def test_balance_as_of_reads_only_the_current_month(self):
+        accounts = Account.objects.filter(user=self.user)
+        for date in (datetime.date(2024, 12, 31), datetime.date(2025, 1, 7),
+                     datetime.date(2025, 2, 15), datetime.date(2025, 3, 31)):
+            with self.assertNumQueries(2):
+                balance = balance_as_of(accounts, date)
+            self.assertEqual(balance, self.replay([self.first, self.second], date))
+
+    def test_series_endpoint(self):
+        response = self.client.get(reverse('balance_series'), {
+            'account': self.first.pk, 'interval': 'day', 'points': 2,
+        })
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['interval'], 'day')
+        self.assertEqual(len(data['points']), 2)
+        self.assertEqual(data['points'][-1]['balance'], '115.50')
+
+        self.assertEqual(self.client.get(reverse('balance_series'), {'interval': 'hour'}).status_code, 400)
+
+    def test_endpoints_are_scoped_to_the_user(self):
+        other = self.make_account(self.make_user(email='other@example.com'), name='Other')
+        self.make_transaction(other, '999.00', date=datetime.date(2025, 1, 1))
+
+        response = self.client.get(reverse('balance_as_of'), {'date': '2025-12-31'})
+        self.assertEqual(response.json()['balance'], '82.75')
+        response = self.client.get(reverse('balance_as_of'), {'date': '2025-12-31', 'account': other.pk})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('balance_series'), {'account': other.pk})
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(ROOT_URLCONF=async_urls, HISAB_SERVER_TIMING=True)
+class AsyncViewTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.accounts = [self.make_account(self.user, name=f'Account{i}') for i in range(3)]
+        for account in self.accounts:
+            for day in range(1, 8):
+                self.make_transaction(account, f'{day}.00', date=datetime.date(2025, 1, day))
+        self.client.force_login(self.user)
+        self.async_client.force_login(self.user)
+
+    def summarize(self, response):
+        return [
+            (
+                item['account'].pk, item['total'], [tx.pk for tx in item['transactions']],
+                item['more_count'], item['card']['html'],
+            )
+            for item in response.context['accounts_data']
+        ]
+
+    async def test_dashboard_matches_sync_view(self):
+        response = await self.async_client.get('/hisab/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        # Counted by the async path of ServerTimingMiddleware, ledger version included
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="5 queries"')
+        self.assertIn('cards;desc="0 hits, 3 misses"', response['Server-Timing'])
+
+        # Render the cards again rather than comparing against the cached ones
+        await sync_to_async(cache.clear)()
+        sync_response = await sync_to_async(self.client.get)('/hisab/')
+        self.assertEqual(self.summarize(response), self.summarize(sync_response))
+        self.assertEqual(response.context['overall_total'], Decimal('84.00'))
+
+    @override_settings(
+        HISAB_QUERY_BUDGETS_ENFORCED=True, HISAB_QUERY_BUDGET_ACTION='raise',
+        HISAB_QUERY_BUDGETS={'hisab_dashboard': 5},
+    )
+    async def test_concurrent_requests_count_only_their_own_queries(self):
+        responses = await asyncio.gather(*(self.async_client.get('/hisab/dashboard/') for _ in range(6)))
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="5 queries"')
+
+    async def test_unchanged_pages_return_304(self):
+        dashboard = '/hisab/dashboard/'
+        for url in (dashboard, f'/hisab/account/{self.accounts[0].pk}/details/'):
+            with self.subTest(url=url):
+                response = await self.async_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('no-cache', response['Cache-Control'])
+                revalidated = await self.async_client.get(url, headers={'if-none-match': response['ETag']})
+                self.assertEqual(revalidated.status_code, 304)
+                self.assertEqual(revalidated.content, b'')
+
+        response = await self.async_client.get(dashboard)
+        self.assertIn('cards;desc="3 hits, 0 misses"', response['Server-Timing'])
+        await sync_to_async(self.make_transaction)(self.accounts[0], '1.00')
+        revalidated = await self.async_client.get(dashboard, headers={'if-none-match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 200)
+
+    @override_settings(HISAB_TRANSACTIONS_PER_PAGE=5)
+    async def test_account_details_get(self):
+        url = f'/hisab/account/{self.accounts[0].pk}/details/'
+        response = await self.async_client.get(url, {'page': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_obj'].number, 2)
+        self.assertEqual(
+            [form.instance.amount for form in response.context['transaction_formset'] if form.instance.pk],
+            [Decimal('2.00'), Decimal('1.00')],
+        )
+        self.assertContains(response, '৳84')  # Overall balance in the navbar
+
+        other = await sync_to_async(self.make_account)(
+            await sync_to_async(self.make_user)(email='other@example.com'), name='Other'
+        )
+        response = await self.async_client.get(f'/hisab/account/{other.pk}/details/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_account_details_post_uses_sync_path(self):
+        account = self.accounts[0]
+        response = await self.async_client.post(f'/hisab/account/{account.pk}/details/', {
+            'transaction_set-TOTAL_FORMS': '1',
+            'transaction_set-INITIAL_FORMS': '0',
+            'transaction_set-0-description': 'Added',
+            'transaction_set-0-amount': '10.00',
+            'transaction_set-0-date': '2025-02-01',
+        })
+        self.assertEqual(response.status_code, 302)
+        await account.arefresh_from_db()
+        self.assertEqual(account.balance, Decimal('38.00'))
+
+    async def test_anonymous_is_redirected(self):
+        await self.async_client.alogout()
+        response = await self.async_client.get('/hisab/dashboard/')
+        self.assertEqual(response.status_code, 302)
+
+
+class AdminChangelistTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin_user = User.objects.create_superuser(email='admin@example.com', password='secret123')
+        self.client.force_login(self.admin_user)
+        self.owner = self.make_user()
+
+    def add_accounts(self, count):
+        for index in range(count):
+            owner = self.make_user(email=f'owner{Account.objects.count()}@example.com')
+            account = self.make_account(owner, name=f'Acc{Account.objects.count()}')
+            self.make_transaction(account, f'{index + 1}.00')
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_rows_or_filter_choices(self):
+        for name in ('admin:hisab_account_changelist', 'admin:hisab_transaction_changelist'):
+            url = reverse(name)
+            self.add_accounts(3)
+            small = self.changelist_queries(url)
+            self.add_accounts(10)
+            self.assertEqual(self.changelist_queries(url), small, name)
+
+    def test_totals_columns_sort_by_stored_fields(self):
+        self.add_accounts(5)
+        url = reverse('admin:hisab_account_changelist')
+        # total_amount_display and transaction_count are columns 6 and 7
+        response = self.client.get(url, {'o': '-6'})
+        balances = [account.balance for account in response.context['cl'].result_list]
+        self.assertEqual(balances, sorted(balances, reverse=True))
+        response = self.client.get(url, {'o': '7'})
+        self.assertIn('transaction_count', str(response.context['cl'].result_list.query))
+
+    def test_autocomplete_filters(self):
+        first = self.make_account(self.owner, name='Rahim')
+        second = self.make_account(self.make_user(email='other@example.com'), name='Karim')
+        self.make_transaction(first, '10.00')
+        self.make_transaction(second, '20.00')
+
+        url = reverse('admin:hisab_transaction_changelist')
+        response = self.client.get(url, {'account__user__id__exact': self.owner.pk})
+        self.assertEqual(
+            [tx.account_id for tx in response.context['cl'].result_list], [first.pk]
+        )
+        self.assertContains(response, 'admin-autocomplete')
+        # Only the selected owner is rendered as an option
+        self.assertContains(response, f'<option value="{self.owner.pk}" selected>')
+        self.assertNotContains(response, f'<option value="{second.user_id}"')
+
+        response = self.client.get(url, {'account__id__exact': second.pk})
+        self.assertEqual([tx.account_id for tx in response.context['cl'].result_list], [second.pk])
+
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'hisab', 'model_name': 'transaction', 'field_name': 'account', 'term': 'Rah',
+        })
+        self.assertEqual([result['id'] for result in response.json()['results']], [str(first.pk)])
+
+
+@override_settings(HISAB_REPORTING_DATABASE='reporting')
+class ReportingRouterTests(LedgerTestMixin, TestCase):
+    """Reporting reads against a second database holding a lagging copy of the primary"""
+    databases = {'default', 'reporting'}
+
+    def setUp(self):
+        super().setUp()
+        with override_settings(HISAB_REPORTING_DATABASE=None):
+            self.user = self.make_user()
+            self.account = self.make_account(self.user, name='Rahim')
+            self.make_transaction(self.account, '100.00', 'Replicated', datetime.date(2025, 1, 1))
+            self.replicate()
+            # Not on the reporting database yet
+            self.make_transaction(self.account, '5.00', 'Lagging', datetime.date(2025, 1, 2))
+        self.client.force_login(self.user)
+
+    def replicate(self):
+        for model in (User, Account, Transaction, MonthlyRollup):
+            rows = list(model._base_manager.using('default').order_by('pk'))
+            model._base_manager.using('reporting').all().delete()
+            model._base_manager.using('reporting').bulk_create(rows)
+
+    def export(self):
+        response = self.client.get(reverse('export_account', args=[self.account.id]))
+        return b''.join(response.streaming_content).decode()
+
+    def test_reporting_reads_use_the_reporting_database(self):
+        self.assertNotIn('Lagging', self.export())
+        response = self.client.get(reverse('balance_as_of'), {'date': '2025-12-31'})
+        self.assertEqual(response.json()['balance'], '100.00')
+        response = self.client.get(reverse('account_statement', args=[self.account.id]), {
+            'start': '2025-01-01', 'end': '2025-01-31',
+        })
+        self.assertEqual(response.context['statement'].closing, Decimal('100.00'))
+        self.assertEqual(response.context['overall_total'](), Decimal('100.00'))
+
+    def test_interactive_pages_stay_on_the_primary(self):
+        response = self.client.get(reverse('account_details', args=[self.account.id]))
+        self.assertContains(response, 'Lagging')
+
+    def test_writer_is_pinned_to_the_primary(self):
+        self.make_transaction(self.account, '1.00', 'Fresh', datetime.date(2025, 1, 3))
+        export = self.export()
+        self.assertIn('Lagging', export)
+        self.assertIn('Fresh', export)
+        cache.clear()
+        self.assertNotIn('Fresh', self.export())
+
+    def test_writes_go_to_the_primary(self):
+        router = ReportingRouter()
+        with reporting(self.user) as alias:
+            self.assertEqual(alias, 'reporting')
+            self.assertEqual(router.db_for_read(Transaction), 'reporting')
+            self.assertEqual(router.db_for_write(Transaction), 'default')
+            account = Account.objects.get(pk=self.account.pk)
+            account.name = 'Renamed'
+            account.save()
+        self.assertEqual(router.db_for_read(Transaction), None)
+        self.assertEqual(Account.objects.using('default').get(pk=self.account.pk).name, 'Renamed')
+        self.assertEqual(Account.objects.using('reporting').get(pk=self.account.pk).name, 'Rahim')
+
+    def test_admin_changelist_reads_the_reporting_database(self):
+        admin_user = User.objects.create_superuser(email='admin@example.com', password='secret123')
+        self.client.force_login(admin_user)
+        Account.objects.using('reporting').filter(pk=self.account.pk).update(name='Replica name')
+        with CaptureQueriesContext(connections['reporting']) as queries:
+            response = self.client.get(reverse('admin:hisab_account_changelist'))
+        self.assertContains(response, 'Replica name')
+        self.assertTrue(queries)
+
+    @override_settings(HISAB_REPORTING_DATABASE=None)
+    def test_disabled_without_a_reporting_database(self):
+        self.assertIn('Lagging', self.export())
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 is SQLite specific')
+class TransactionSearchTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.rahim = self.make_account(self.user, name='Rahim')
+        self.karim = self.make_account(self.user, name='Karim')
+        self.make_transaction(self.rahim, '-500.00', 'House rent March', datetime.date(2025, 3, 1))
+        self.make_transaction(self.karim, '-20.00', 'Rent for the car, rent paid late', datetime.date(2025, 2, 1))
+        self.make_transaction(self.karim, '15.00', 'Rental deposit refund', datetime.date(2025, 1, 1))
+        self.make_transaction(self.rahim, '5.00', 'Tea', datetime.date(2025, 1, 1))
+        other = self.make_account(self.make_user(email='other@example.com'), name='Other')
+        self.make_transaction(other, '1.00', 'Rent of someone else')
+        self.client.force_login(self.user)
+
+    def descriptions(self, text):
+        return [tx.description for tx in search_transactions(self.user, text)[:100]]
+
+    def test_prefix_match_ranked_and_scoped_to_user(self):
+        self.assertEqual(self.descriptions('ren'), [
+            'Rent for the car, rent paid late', 'House rent March', 'Rental deposit refund',
+        ])
+        self.assertEqual(self.descriptions('rent mar'), ['House rent March'])
+        self.assertEqual(search_transactions(self.user, 'ren').count(), 3)
+
+    def test_operators_in_input_are_literal(self):
+        self.assertEqual(match_expression('rent" OR (tea* -'), '"rent"* "OR"* "tea"*')
+        self.assertEqual(self.descriptions('"NEAR(tea'), [])
+        self.assertEqual(self.descriptions('!!'), [])
+
+    def test_index_follows_every_write_path(self):
+        tx = Transaction.objects.get(description='Tea')
+        tx.description = 'Green tea'
+        tx.save()
+        self.assertEqual(self.descriptions('green'), ['Green tea'])
+        Transaction.objects.filter(pk=tx.pk).update(description='Coffee')
+        self.assertEqual(self.descriptions('green'), [])
+        self.assertEqual(self.descriptions('coff'), ['Coffee'])
+        import_transactions(self.rahim, StringIO('Imported groceries,10.00,2025-04-01\n'))
+        self.assertEqual(self.descriptions('groc'), ['Imported groceries'])
+        self.karim.delete()
+        self.assertEqual(self.descriptions('rent'), ['House rent March'])
+
+    def test_view_paginates_in_a_fixed_number_of_queries(self):
+        for day in range(1, 29):
+            self.make_transaction(self.rahim, '1.00', f'Rent share {day}', datetime.date(2024, 2, day))
+        url = reverse('search_transactions')
+        with override_settings(HISAB_TRANSACTIONS_PER_PAGE=10):
+            # session, user, overall balance (cached from then on), count, page
+            with self.assertNumQueries(5):
+                response = self.client.get(url, {'q': 'rent'})
+            self.assertEqual(response.context['page_obj'].paginator.count, 31)
+            self.assertContains(response, '?q=rent&amp;page=2')
+            self.assertContains(response, 'Karim')
+
+            with self.assertNumQueries(4):
+                response = self.client.get(url, {'q': 'rent', 'page': 4})
+            self.assertEqual(len(response.context['page_obj'].object_list), 1)
+
+    def test_view_without_query(self):
+        response = self.client.get(reverse('search_transactions'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['page_obj'])
+
+    def test_match_uses_the_index(self):
+        search = search_transactions(self.user, 'rent')
+        with CaptureQueriesContext(connection) as context:
+            search[:10]
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {context.captured_queries[0]['sql']}")
+            plan = [row[-1] for row in cursor.fetchall()]
+        self.assertTrue(any(step.startswith(f'SCAN {FTS_TABLE} VIRTUAL TABLE') for step in plan), plan)
+        self.assertFalse(any(step.startswith('SCAN t') or step.startswith('SCAN a') for step in plan), plan)
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('delete-all')")
+        self.assertEqual(self.descriptions('rent'), [])
+        out = StringIO()
+        call_command('rebuild_search_index', '--optimize', stdout=out)
+        self.assertIn('Indexed 5 transactions', out.getvalue())
+        self.assertEqual(len(self.descriptions('rent')), 3)
+
+
+class TransactionEndpointTests(LedgerTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.make_user()
+        self.account = self.make_account(self.user)
+        self.tx = self.make_transaction(self.account, '100.00', 'Opening', datetime.date(2025, 1, 1))
+        self.client.force_login(self.user)
+
+    def test_create(self):
+        response = self.client.post(reverse('create_transaction', args=[self.account.id]), {
+            'description': 'Tea', 'amount': '-5.5', 'date': '2025-01-02',
+        })
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['balance'], '94.50')
+        self.assertEqual(data['transaction_count'], 2)
+        self.assertEqual(data['transaction']['description'], 'Tea')
+        self.assertEqual(data['transaction']['amount'], '-5.50')
+        self.assertEqual(data['transaction']['date'], '2025-01-02')
+        self.assertTrue(Transaction.objects.filter(pk=data['transaction']['id'], account=self.account).exists())
+
+    def test_update(self):
+        response = self.client.post(reverse('update_transaction', args=[self.account.id, self.tx.id]), {
+            'description': 'Opening balance', 'amount': '150.00', 'date': '2025-01-01',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['balance'], '150.00')
+        self.tx.refresh_from_db()
+        self.assertEqual((self.tx.description, self.tx.amount), ('Opening balance', Decimal('150.00')))
+
+    def test_delete(self):
+        response = self.client.post(reverse('delete_transaction', args=[self.account.id, self.tx.id]))
+        self.assertEqual(response.json(), {'balance': '0.00', 'transaction_count': 0, 'deleted': self.tx.id})
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_validation_errors(self):
+        response = self.client.post(reverse('update_transaction', args=[self.account.id, self.tx.id]), {
+            'description': '', 'amount': 'abc', 'date': '2025-01-01',
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {'description', 'amount'})
+        self.tx.refresh_from_db()
+        self.assertEqual(self.tx.amount, Decimal('100.00'))
+
+    def test_requires_post_and_ownership(self):
+        url = reverse('update_transaction', args=[self.account.id, self.tx.id])
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+        other = self.make_account(self.make_user(email='other@example.com'), name='Other')
+        other_tx = self.make_transaction(other, '1.00')
+        for url in (
+            reverse('create_transaction', args=[other.id]),
+            reverse('update_transaction', args=[other.id, other_tx.id]),
+            reverse('delete_transaction', args=[other.id, other_tx.id]),
+            # Own account, someone else's transaction
+            reverse('delete_transaction', args=[self.account.id, other_tx.id]),
+        ):
+            self.assertEqual(self.client.post(url, {
+                'description': 'x', 'amount': '1', 'date': '2025-01-01',
+            }).status_code, 404, url)
+        self.assertEqual(Transaction.objects.get(pk=other_tx.pk).amount, Decimal('1.00'))
+
+    def test_cost_does_not_grow_with_account_size(self):
+        url = reverse('update_transaction', args=[self.account.id, self.tx.id])
+        counts = []
+        for extra in (0, 200):
+            for day in range(extra):
+                self.make_transaction(self.account, '1.00', date=datetime.date(2024, 1, 1))
+            with CaptureQueriesContext(connection) as queries:
+                self.client.post(url, {'description': 'Opening', 'amount': f'{extra + 1}.00', 'date': '2025-01-01'})
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class StaticFilesTests(LedgerTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = cls.enterClassContext(tempfile.TemporaryDirectory())
+        cls.enterClassContext(override_settings(
+            STATIC_ROOT=cls.static_root,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'hisab.staticfiles.CompressedManifestStaticFilesStorage'},
+            },
+        ))
+        call_command('collectstatic', interactive=False, verbosity=0, ignore_patterns=['admin'])
+
+    def hashed_url(self, html, name):
+        stem, extension = name.rsplit('.', 1)
+        return re.search(rf'/static/({stem}\.[0-9a-f]{{12}}\.{extension})"', html).group(1)
+
+    def test_pages_link_hashed_assets_instead_of_inlining_them(self):
+        user = self.make_user()
+        account = self.make_account(user)
+        self.client.force_login(user)
+        for url, assets in (
+            (reverse('hisab_dashboard'), ['css/base.css', 'css/dashboard.css', 'js/dashboard.js']),
+            (reverse('account_details', args=[account.id]), ['css/account_details.css', 'js/account_details.js']),
+        ):
+            html = self.client.get(url).content.decode()
+            self.assertNotIn('<style>', html)
+            self.assertNotIn('<script>', html)
+            for name in assets:
+                self.assertTrue(self.hashed_url(html, name))
+
+    def test_serves_precompressed_immutable_files(self):
+        html = self.client.get(reverse('login')).content.decode()
+        path = self.hashed_url(html, 'css/base.css')
+        with open(f'{self.static_root}/{path}', 'rb') as original:
+            content = original.read()
+
+        factory = RequestFactory()
+        response = serve_static(factory.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate'), path)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), content)
+        response.close()
+
+        response = serve_static(factory.get('/'), path)
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(b''.join(response.streaming_content), content)
+        response.close()
+
+        # Unhashed names can change content, so they are revalidated
+        response = serve_static(factory.get('/'), 'css/base.css')
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+        response.close()
+
+        last_modified = response['Last-Modified']
+        for name, cache_control in (
+            (path, 'public, max-age=31536000, immutable'), ('css/base.css', 'public, no-cache'),
+        ):
+            response = serve_static(factory.get('/', HTTP_IF_MODIFIED_SINCE=last_modified), name)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['Cache-Control'], cache_control)
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
@@ -0,0 +1,125 @@
+import datetime
+import math
+from decimal import Decimal
+
+from django.db.models import F, Func, Sum, Window
+from django.db.models.functions import TruncDay, TruncWeek
+
+from .fields import MoneyField
+from .models import MonthlyRollup, Transaction, month_start
+
+# Sums of minor units, converted back to Decimal rupees
+MONEY = MoneyField(max_digits=12)
+CENT = Decimal('0.01')
+
+INTERVALS = ('day', 'week', 'month')
+
+
+class RunningTotal(Func):
+    """SUM(<expression>) usable as a window over an already grouped aggregate"""
+    function = 'SUM'
+    window_compatible = True
+
+
+def balance_as_of(accounts, date):
+    """
+    Combined balance of `accounts` (an Account queryset) at the end of `date`.
+
+    Whole months before `date` come from MonthlyRollup, so only the
+    transactions of date's own month are read.
+    """
+    first_day = month_start(date)
+    account_ids = accounts.values('pk')
+    before = MonthlyRollup.objects.filter(
+        account__in=account_ids, month__lt=first_day
+    ).aggregate(total=Sum('total', output_field=MONEY))['total']
+    current = Transaction.objects.filter(
+        account__in=account_ids, date__range=(first_day, date)
+    ).aggregate(total=Sum('amount', output_field=MONEY))['total']
+    return ((before or Decimal('0')) + (current or Decimal('0'))).quantize(CENT)
+
+
+def bucketed_changes(accounts, interval, start=None, end=None):
+    """
+    Net change and running balance per day/week/month, grouped and summed
+    in SQL. Monthly series are read from MonthlyRollup; finer ones from
+    the transactions themselves.
+    """
+    if interval == 'month':
+        rows = MonthlyRollup.objects.filter(account__in=accounts.values('pk'))
+        bucket, amount = F('month'), 'total'
+        if start:
+            rows = rows.filter(month__gte=start)
+        if end:
+            rows = rows.filter(month__lte=end)
+    else:
+        rows = Transaction.objects.filter(account__in=accounts.values('pk'))
+        bucket = TruncDay('date') if interval == 'day' else TruncWeek('date')
+        amount = 'amount'
+        if start:
+            rows = rows.filter(date__gte=start)
+        if end:
+            rows = rows.filter(date__lte=end)
+
+    return (
+        rows.order_by()
+        .annotate(bucket=bucket)
+        .values('bucket')
+        .annotate(change=Sum(amount, output_field=MONEY))
+        .annotate(balance=Window(
+            RunningTotal(Sum(amount), output_field=MONEY), order_by=F('bucket').asc()
+        ))
+        .order_by('bucket')
+    )
+
+
+def downsample(points, max_points):
+    """
+    Merge consecutive points so at most max_points remain. Each merged point
+    keeps the balance at its last bucket and the summed change, so the
+    series stays exact at every point it reports.
+    """
+    if len(points) <= max_points:
+        return points
+    step = math.ceil(len(points) / max_points)
+    return [
+        {
+            'date': group[-1]['date'],
+            'change': sum((point['change'] for point in group), Decimal('0')),
+            'balance': group[-1]['balance'],
+        }
+        for group in (points[index:index + step] for index in range(0, len(points), step))
+    ]
+
+
+def balance_series(accounts, interval='month', start=None, end=None, max_points=120):
+    """Cumulative balance of `accounts` per interval, capped at max_points points"""
+    if start and interval == 'month':
+        # Monthly buckets always cover whole months
+        start = month_start(start)
+    # A rollup covers its whole month, so the month containing `end` is summed
+    # from the transactions up to `end` instead
+    last_month = month_start(end) if end and interval == 'month' else None
+    opening = Decimal('0')
+    if start:
+        opening = balance_as_of(accounts, start - datetime.timedelta(days=1))
+    points = [
+        {
+            'date': row['bucket'],
+            'change': row['change'].quantize(CENT),
+            'balance': (opening + row['balance']).quantize(CENT),
+        }
+        for row in bucketed_changes(
+            accounts, interval, start, last_month - datetime.timedelta(days=1) if last_month else end
+        )
+    ]
+    if last_month:
+        change = Transaction.objects.filter(
+            account__in=accounts.values('pk'), date__range=(last_month, end)
+        ).aggregate(total=Sum('amount', output_field=MONEY))['total']
+        if change is not None:
+            balance = points[-1]['balance'] if points else opening
+            points.append({
+                'date': last_month, 'change': change.quantize(CENT), 'balance': (balance + change).quantize(CENT),
+            })
+    return {'opening': opening, 'points': downsample(points, max_points)}
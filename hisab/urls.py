@@ -1,14 +1,42 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Under ASGI the read views can run on the async ORM instead of a worker thread
+if getattr(settings, 'HISAB_ASYNC_VIEWS', False):
+    dashboard_view, account_details = views.adashboard_view, views.aaccount_details
+else:
+    dashboard_view, account_details = views.dashboard_view, views.account_details
+
 urlpatterns = [
     # Main dashboard
-    path('', views.dashboard_view, name='hisab_dashboard'),
-    path('dashboard/', views.dashboard_view, name='hisab_dashboard'),
+    path('', dashboard_view, name='hisab_dashboard'),
+    path('dashboard/', dashboard_view, name='hisab_dashboard'),
     
     # Account management
     path('account/create/', views.create_account, name='create_account'),
     path('account/<int:account_id>/edit/', views.edit_account, name='edit_account'),
     path('account/<int:account_id>/delete/', views.delete_account, name='delete_account'),
-    path('account/<int:account_id>/details/', views.account_details, name='account_details'),
+    path('account/<int:account_id>/details/', account_details, name='account_details'),
+    path('account/<int:account_id>/export/', views.export_account, name='export_account'),
+    path('account/<int:account_id>/import/', views.import_transactions, name='import_transactions'),
+    path('account/<int:account_id>/statement/', views.account_statement, name='account_statement'),
+
+    # Single transaction changes (JSON)
+    path('account/<int:account_id>/transactions/', views.create_transaction, name='create_transaction'),
+    path(
+        'account/<int:account_id>/transactions/<int:transaction_id>/',
+        views.update_transaction, name='update_transaction'
+    ),
+    path(
+        'account/<int:account_id>/transactions/<int:transaction_id>/delete/',
+        views.delete_transaction, name='delete_transaction'
+    ),
+
+    # Transaction search
+    path('search/', views.search_view, name='search_transactions'),
+
+    # Balance history (JSON)
+    path('balance/series/', views.balance_series_view, name='balance_series'),
+    path('balance/as-of/', views.balance_as_of_view, name='balance_as_of'),
 ]
\ No newline at end of file
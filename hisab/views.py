@@ -1,12 +1,209 @@
-from django.shortcuts import render, get_object_or_404, redirect
+import hashlib
+from decimal import Decimal
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, get_object_or_404, aget_object_or_404, redirect
+from django.template.loader import render_to_string
+from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.cache import cache_control
+from django.middleware.csrf import get_token
+from django.views.decorators.http import condition, require_POST
 from django.contrib import messages
-from django.db.models import Sum
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.urls import reverse
 from django.utils import timezone
-from .models import Account, Transaction
-from .forms import AccountForm, TransactionForm, TransactionFormSet
+from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
+from django.utils.timesince import timesince
+from .models import Account, LedgerVersion, Transaction
+from .forms import (
+    AccountForm, BalanceAsOfForm, BalanceSeriesForm, StatementForm, TransactionForm,
+    TransactionFormSet, TransactionImportForm, TransactionSearchForm,
+)
+from .cache import account_card_key, get_cache, record_card_lookups
+from .context_processors import aprepare_request
+from .exporters import ledger_export_response
+from .importers import import_transactions as run_import
+from .routers import reporting_view
+from .search import search_transactions
+from .statements import build_statement
+from .timeseries import balance_as_of, balance_series
+
+def transaction_paginator(account):
+    ordered = Transaction.objects.filter(account=account).order_by('-date', '-id')
+    paginator = Paginator(
+        ordered.values_list('pk', flat=True),
+        getattr(settings, 'HISAB_TRANSACTIONS_PER_PAGE', 50),
+    )
+    return ordered, paginator
+
+
+def transaction_page(request, account):
+    """Current page of an account's transactions (newest first) and its queryset"""
+    ordered, paginator = transaction_paginator(account)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    # Only the visible page is bound into the formset
+    return page_obj, ordered.filter(pk__in=list(page_obj.object_list))
+
+
+async def atransaction_page(request, account):
+    """Async transaction_page(): the count and page ids are fetched with the async ORM"""
+    ordered, paginator = transaction_paginator(account)
+    paginator.count = await ordered.acount()
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.object_list = [pk async for pk in page_obj.object_list]
+    return page_obj, ordered.filter(pk__in=page_obj.object_list)
+
+
+def ledger_version(request):
+    """The user's LedgerVersion row (or None), looked up once per request"""
+    if not hasattr(request, 'hisab_ledger_version'):
+        request.hisab_ledger_version = LedgerVersion.objects.filter(user=request.user).first()
+    return request.hisab_ledger_version
+
+
+def conditional_ledger_page(request):
+    # Redirects, form POSTs and pages carrying flash messages are never revalidated
+    return (
+        request.method in ('GET', 'HEAD')
+        and request.user.is_profile_complete
+        and not len(messages.get_messages(request))
+    )
+
+
+def csrf_digest(request):
+    """
+    Short digest of the request's CSRF secret. Pages embed tokens derived
+    from it, and logging in rotates it, so a page cached under the old
+    secret must not be revalidated.
+    """
+    get_token(request)  # Creates the secret when the client has none yet
+    return hashlib.md5(request.META['CSRF_COOKIE'].encode()).hexdigest()[:12]
+
+
+def ledger_etag(request, *args, **kwargs):
+    """Changes with any of the user's accounts or transactions, their profile or CSRF secret"""
+    if not conditional_ledger_page(request):
+        return None
+    version = ledger_version(request)
+    if version is None:
+        return None
+    return (
+        f'ledger-{request.user.pk}-{version.version}-{request.user.updated_at.timestamp()}'
+        f'-{csrf_digest(request)}'
+    )
+
+
+def ledger_last_modified(request, *args, **kwargs):
+    if not conditional_ledger_page(request):
+        return None
+    version = ledger_version(request)
+    if version is None:
+        return None
+    return max(version.modified_at, request.user.updated_at)
+
+
+# Unchanged ledger pages answer 304 before any aggregate runs or template renders.
+# no-cache makes browsers revalidate every time instead of guessing a freshness lifetime.
+ledger_condition = condition(etag_func=ledger_etag, last_modified_func=ledger_last_modified)
+revalidate = cache_control(private=True, no_cache=True)
+
+
+def aledger_condition(view):
+    """
+    ledger_condition for async views. Django calls the validators
+    synchronously, so the user and their LedgerVersion are loaded with the
+    async ORM first and the validators run without touching the database.
+    """
+    conditional = ledger_condition(view)
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await aprepare_request(request, with_balance=False)
+        if request.method in ('GET', 'HEAD'):
+            request.hisab_ledger_version = await LedgerVersion.objects.filter(user=user).afirst()
+        return await conditional(request, *args, **kwargs)
+    return wrapper
+
+
+def group_recent_transactions(transactions):
+    """Rows of latest_per_account() as {account_id: [newest, ...]}"""
+    recent_transactions = {}
+    for tx in transactions:
+        recent_transactions.setdefault(tx.account_id, []).append(tx)
+    for account_transactions in recent_transactions.values():
+        account_transactions.sort(key=lambda tx: tx.row_number)
+    return recent_transactions
+
+
+def lookup_account_cards(accounts):
+    """
+    Dashboard card slots of `accounts` as {account_id: card}, with the cached
+    HTML filled in where present. Cards are keyed by account state, so only
+    accounts that changed since their card was rendered miss.
+    """
+    cards = {}
+    for account in accounts:
+        updated_label = timesince(account.updated_at)
+        cards[account.pk] = {
+            'key': account_card_key(account, updated_label),
+            'updated_label': updated_label,
+            'html': None,
+        }
+    found = get_cache().get_many([card['key'] for card in cards.values()])
+    for card in cards.values():
+        if card['key'] in found:
+            card['html'] = mark_safe(found[card['key']])
+    hits = len(found)
+    record_card_lookups(hits, len(cards) - hits)
+    return cards
+
+
+def render_account_cards(accounts_data):
+    """Render and cache the cards that lookup_account_cards() missed"""
+    rendered = {}
+    for item in accounts_data:
+        if item['card']['html'] is None:
+            # No request: context processors have nothing to add to a card
+            item['card']['html'] = render_to_string('hisab/account_card.html', {'item': item})
+            rendered[item['card']['key']] = item['card']['html']
+    if rendered:
+        get_cache().set_many(rendered, getattr(settings, 'HISAB_CARD_CACHE_TIMEOUT', 24 * 60 * 60))
+
+
+def stale_card_accounts(cards):
+    return [account_id for account_id, card in cards.items() if card['html'] is None]
+
+
+def dashboard_context(accounts, recent_transactions, cards):
+    # Totals come straight from the stored account balances
+    accounts_data = []
+    overall_total = 0
+
+    for account in accounts:
+        transactions = recent_transactions.get(account.id, [])
+        overall_total += account.balance
+
+        accounts_data.append({
+            'account': account,
+            'total': account.balance,
+            'card': cards[account.id],
+            'transactions': transactions,  # Show recent 5, fetched for stale cards only
+            'more_count': account.transaction_count - len(transactions),
+        })
+
+    return {
+        'accounts_data': accounts_data,
+        'overall_total': overall_total
+    }
+
 
 @login_required
+@revalidate
+@ledger_condition
 def dashboard_view(request):
     """Simple dashboard view with all accounts"""
     # Check if user profile is complete
@@ -17,29 +214,43 @@ def dashboard_view(request):
         )
         return redirect('profile')
 
-    accounts = Account.objects.filter(user=request.user).order_by('-updated_at')
-    
-    # Calculate totals for each account
-    accounts_data = []
-    overall_total = 0
-    
-    for account in accounts:
-        total = Transaction.objects.filter(account=account).aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-        
-        overall_total += total
-        
-        accounts_data.append({
-            'account': account,
-            'total': total,
-            'transactions': Transaction.objects.filter(account=account).order_by('-date')[:5]  # Show recent 5
-        })
+    accounts = list(Account.objects.filter(user=request.user).order_by('-updated_at'))
+    cards = lookup_account_cards(accounts)
 
-    context = {
-        'accounts_data': accounts_data,
-        'overall_total': overall_total
-    }
+    # Latest 5 transactions of every stale card's account in a single windowed query
+    stale = stale_card_accounts(cards)
+    recent_transactions = group_recent_transactions(
+        Transaction.objects.filter(account__in=stale).latest_per_account(5) if stale else []
+    )
+    context = dashboard_context(accounts, recent_transactions, cards)
+    render_account_cards(context['accounts_data'])
+    return render(request, 'hisab/dashboard.html', context)
+
+
+@login_required
+@revalidate
+@aledger_condition
+async def adashboard_view(request):
+    """dashboard_view for ASGI: every query goes through the async ORM"""
+    user = await aprepare_request(request, with_balance=False)
+    if not user.is_profile_complete:
+        messages.warning(
+            request,
+            'Please complete your profile to access all features.'
+        )
+        return redirect('profile')
+
+    accounts = [
+        account async for account in Account.objects.filter(user=user).order_by('-updated_at')
+    ]
+    cards = await sync_to_async(lookup_account_cards)(accounts)
+    stale = stale_card_accounts(cards)
+    recent_transactions = group_recent_transactions([
+        tx async for tx in
+        Transaction.objects.filter(account__in=stale).latest_per_account(5)
+    ] if stale else [])
+    context = dashboard_context(accounts, recent_transactions, cards)
+    await sync_to_async(render_account_cards)(context['accounts_data'])
     return render(request, 'hisab/dashboard.html', context)
 
 @login_required
@@ -83,10 +294,11 @@ def create_account(request):
 def edit_account(request, account_id):
     """Edit existing account with transactions using forms"""
     account = get_object_or_404(Account, id=account_id, user=request.user)
+    page_obj, page_transactions = transaction_page(request, account)
     
     if request.method == 'POST':
         account_form = AccountForm(request.POST, instance=account)
-        formset = TransactionFormSet(request.POST, instance=account)
+        formset = TransactionFormSet(request.POST, instance=account, queryset=page_transactions)
         
         if account_form.is_valid() and formset.is_valid():
             account_form.save()
@@ -97,11 +309,12 @@ def edit_account(request, account_id):
             messages.error(request, 'Please correct the errors below.')
     else:
         account_form = AccountForm(instance=account)
-        formset = TransactionFormSet(instance=account)
+        formset = TransactionFormSet(instance=account, queryset=page_transactions)
 
     context = {
         'account_form': account_form,
         'transaction_formset': formset,
+        'page_obj': page_obj,
         'account': account,
         'is_create': False,
         'title': f'Edit Account: {account.name}'
@@ -115,50 +328,275 @@ def delete_account(request, account_id):
     
     if request.method == 'POST':
         account_name = account.name
-        account.delete()
+        if account.transaction_count > getattr(settings, 'HISAB_INLINE_DELETE_LIMIT', 10000):
+            # Hidden now; purge_deleted_accounts removes it outside the request
+            account.request_purge()
+        else:
+            account.purge(getattr(settings, 'HISAB_PURGE_CHUNK_SIZE', 5000))
         messages.success(request, f'Account "{account_name}" deleted successfully!')
         return redirect('hisab_dashboard')
 
     context = {
         'account': account,
-        'total_transactions': Transaction.objects.filter(account=account).count()
+        'total_transactions': account.transaction_count
     }
     return render(request, 'hisab/confirm_delete.html', context)
 
 
 
 @login_required
+@revalidate
+@ledger_condition
 def account_details(request, account_id):
     """View and manage account transactions using formsets - EXACT COPY of edit_account pattern"""
     account = get_object_or_404(Account, id=account_id, user=request.user)
+    page_obj, page_transactions = transaction_page(request, account)
     
     if request.method == 'POST':
-        # Use EXACT same pattern as edit_account
-        print(f"POST data received: {dict(request.POST)}")  # Debug
-        formset = TransactionFormSet(request.POST, instance=account)
-        print(f"Formset errors: {formset.errors}")  # Debug
-        print(f"Formset is_valid: {formset.is_valid()}")  # Debug
+        # Use EXACT same pattern as edit_account, limited to the current page
+        formset = TransactionFormSet(request.POST, instance=account, queryset=page_transactions)
         
         if formset.is_valid():
-            instances = formset.save()
-            print(f"Saved instances: {len(instances)}")  # Debug
+            formset.save()
             messages.success(request, f'Transactions for "{account.name}" updated successfully!')
-            return redirect('account_details', account_id=account.id)
+            url = reverse('account_details', args=[account.id])
+            if page_obj.number > 1:
+                url += f'?page={page_obj.number}'
+            return redirect(url)
         else:
-            print(f"Form errors: {formset.errors}")  # Debug
-            print(f"Non-form errors: {formset.non_form_errors()}")  # Debug
             messages.error(request, 'Please correct the errors below.')
     else:
-        formset = TransactionFormSet(instance=account)
+        formset = TransactionFormSet(instance=account, queryset=page_transactions)
 
-    transactions = Transaction.objects.filter(account=account).order_by('-date')
-    total = transactions.aggregate(total=Sum('amount'))['total'] or 0
-    
     context = {
         'account': account,
-        'transactions': transactions,
+        'page_obj': page_obj,
         'transaction_formset': formset,
-        'total': total,
+        'total': account.balance,  # Whole account, not just this page
         'title': f'Account Details: {account.name}'
     }
-    return render(request, 'hisab/account_details.html', context)
\ No newline at end of file
+    return render(request, 'hisab/account_details.html', context)
+
+
+@login_required
+@revalidate
+@aledger_condition
+async def aaccount_details(request, account_id):
+    """account_details for ASGI: GET runs on the async ORM, POST falls back to the sync view"""
+    if request.method == 'POST':
+        return await sync_to_async(account_details)(request, account_id)
+
+    user = await aprepare_request(request)
+    account = await aget_object_or_404(Account, id=account_id, user=user)
+    page_obj, page_transactions = await atransaction_page(request, account)
+    formset = TransactionFormSet(instance=account, queryset=page_transactions)
+    # Load the page now; rendering is synchronous and must not query
+    async for _ in formset.get_queryset():
+        pass
+
+    context = {
+        'account': account,
+        'page_obj': page_obj,
+        'transaction_formset': formset,
+        'total': account.balance,
+        'title': f'Account Details: {account.name}'
+    }
+    return render(request, 'hisab/account_details.html', context)
+
+
+def transaction_data(tx):
+    return {
+        'id': tx.pk,
+        'description': tx.description,
+        'amount': Decimal(tx.amount).quantize(Decimal('0.01')),
+        'date': tx.date,
+    }
+
+
+def ledger_response(account, status=200, **data):
+    """JSON reply to a single-transaction change, with the account's new totals"""
+    account.refresh_from_db(fields=['balance', 'transaction_count'])
+    return JsonResponse({
+        'balance': account.balance,
+        'transaction_count': account.transaction_count,
+        **data,
+    }, status=status)
+
+
+def owned_transaction(request, account_id, transaction_id):
+    return get_object_or_404(
+        Transaction.objects.select_related('account'),
+        id=transaction_id, account_id=account_id, account__user=request.user,
+        account__purge_requested_at__isnull=True,
+    )
+
+
+@login_required
+@require_POST
+def create_transaction(request, account_id):
+    """Add one transaction; returns the saved row and the new balance as JSON"""
+    account = get_object_or_404(Account, id=account_id, user=request.user)
+    form = TransactionForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    tx = form.save(commit=False)
+    tx.account = account
+    tx.save()
+    return ledger_response(account, status=201, transaction=transaction_data(tx))
+
+
+@login_required
+@require_POST
+def update_transaction(request, account_id, transaction_id):
+    """Edit one transaction; returns the saved row and the new balance as JSON"""
+    tx = owned_transaction(request, account_id, transaction_id)
+    form = TransactionForm(request.POST, instance=tx)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    form.save()
+    return ledger_response(tx.account, transaction=transaction_data(tx))
+
+
+@login_required
+@require_POST
+def delete_transaction(request, account_id, transaction_id):
+    """Delete one transaction; returns its id and the new balance as JSON"""
+    tx = owned_transaction(request, account_id, transaction_id)
+    deleted_id = tx.pk
+    tx.delete()
+    return ledger_response(tx.account, deleted=deleted_id)
+
+
+@login_required
+@reporting_view
+def export_account(request, account_id):
+    """Stream the account ledger with a running balance as CSV or JSON"""
+    account = get_object_or_404(Account, id=account_id, user=request.user)
+    export_format = 'json' if request.GET.get('format') == 'json' else 'csv'
+    return ledger_export_response(
+        Transaction.objects.filter(account=account),
+        f'hisab-account-{account.id}',
+        export_format,
+    )
+
+
+@login_required
+def import_transactions(request, account_id):
+    """Bulk import transactions into an account from an uploaded CSV file"""
+    account = get_object_or_404(Account, id=account_id, user=request.user)
+    result = None
+
+    if request.method == 'POST':
+        form = TransactionImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            try:
+                result = run_import(account, request.FILES['file'].file)
+            except UnicodeDecodeError:
+                form.add_error('file', 'The file must be a UTF-8 encoded CSV.')
+            else:
+                if result.error_count:
+                    messages.warning(
+                        request,
+                        f'Imported {result.created} transactions; {result.error_count} rows had errors.'
+                    )
+                else:
+                    messages.success(request, f'Imported {result.created} transactions into "{account.name}".')
+        else:
+            messages.error(request, 'Please correct the errors below.')
+    else:
+        form = TransactionImportForm()
+
+    context = {
+        'account': account,
+        'form': form,
+        'result': result,
+        'title': f'Import Transactions: {account.name}'
+    }
+    return render(request, 'hisab/import_transactions.html', context)
+
+
+@login_required
+@reporting_view
+def account_statement(request, account_id):
+    """Opening balance, monthly changes and closing balance over a date range"""
+    account = get_object_or_404(Account, id=account_id, user=request.user)
+    today = timezone.localdate()
+    form = StatementForm(request.GET or {'start': today.replace(month=1, day=1), 'end': today})
+
+    statement = None
+    if form.is_valid():
+        statement = build_statement(account, form.cleaned_data['start'], form.cleaned_data['end'])
+
+    context = {
+        'account': account,
+        'form': form,
+        'statement': statement,
+        'title': f'Statement: {account.name}'
+    }
+    return render(request, 'hisab/account_statement.html', context)
+
+
+@login_required
+def search_view(request):
+    """Full-text search over the descriptions of all the user's transactions"""
+    form = TransactionSearchForm(request.GET)
+    page_obj = None
+    if form.is_valid():
+        paginator = Paginator(
+            search_transactions(request.user, form.cleaned_data['q']),
+            getattr(settings, 'HISAB_TRANSACTIONS_PER_PAGE', 50),
+        )
+        page_obj = paginator.get_page(request.GET.get('page'))
+
+    context = {
+        'form': form,
+        'page_obj': page_obj,
+        # Keeps the search when pagination.html links to other pages
+        'page_query': f"{urlencode({'q': form.cleaned_data['q']})}&" if page_obj else '',
+        'title': 'Search Transactions'
+    }
+    return render(request, 'hisab/search.html', context)
+
+
+def balance_accounts(request, account_id):
+    """One of the user's accounts, or all of them when no account is given"""
+    accounts = Account.objects.filter(user=request.user)
+    if account_id is not None:
+        get_object_or_404(accounts, pk=account_id)
+        accounts = accounts.filter(pk=account_id)
+    return accounts
+
+
+@login_required
+@reporting_view
+def balance_series_view(request):
+    """JSON cumulative balance per day/week/month for an account or all accounts"""
+    form = BalanceSeriesForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    max_points = getattr(settings, 'HISAB_BALANCE_SERIES_MAX_POINTS', 120)
+    interval = form.cleaned_data['interval'] or 'month'
+    series = balance_series(
+        balance_accounts(request, form.cleaned_data['account']),
+        interval=interval,
+        start=form.cleaned_data['start'],
+        end=form.cleaned_data['end'],
+        max_points=min(form.cleaned_data['points'] or max_points, max_points),
+    )
+    return JsonResponse({'interval': interval, **series})
+
+
+@login_required
+@reporting_view
+def balance_as_of_view(request):
+    """JSON balance of an account (or all accounts) at the end of a given date"""
+    form = BalanceAsOfForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    date = form.cleaned_data['date']
+    return JsonResponse({
+        'date': date,
+        'balance': balance_as_of(balance_accounts(request, form.cleaned_data['account']), date),
+    })
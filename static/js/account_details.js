@@ -0,0 +1,163 @@
+// Add Transaction Form
+function addTransactionForm() {
+    const formset = document.getElementById('transaction-formset');
+    const totalForms = document.querySelector('#transactions-form input[name$="-TOTAL_FORMS"]');
+    const formIndex = parseInt(totalForms.value);
+
+    const template = document.getElementById('transaction-empty-form');
+    if (template) {
+        const newFormHtml = template.innerHTML.replace(/__prefix__/g, formIndex);
+        const temp = document.createElement('div');
+        temp.innerHTML = newFormHtml;
+        const newForm = temp.firstElementChild;
+        formset.appendChild(newForm);
+        totalForms.value = formIndex + 1;
+
+        // Scroll to new form
+        newForm.scrollIntoView({ behavior: 'smooth', block: 'center' });
+    }
+}
+
+// Single transaction changes go straight to the JSON endpoints
+const transactionsForm = document.getElementById('transactions-form');
+const csrfToken = transactionsForm.querySelector('[name=csrfmiddlewaretoken]').value;
+const FIELDS = ['description', 'amount', 'date'];
+
+function ledgerRequest(url, body) {
+    return fetch(url, {
+        method: 'POST',
+        headers: { 'X-CSRFToken': csrfToken },
+        body: body,
+        credentials: 'same-origin'
+    }).then(response => response.json().then(data => {
+        if (!response.ok) throw data;
+        return data;
+    }));
+}
+
+function fieldInput(container, field) {
+    return container.querySelector('input[name$="-' + field + '"], input[data-field="' + field + '"]');
+}
+
+function transactionBody(container) {
+    const body = new FormData();
+    FIELDS.forEach(field => {
+        const input = fieldInput(container, field);
+        body.append(field, input ? input.value : '');
+    });
+    return body;
+}
+
+function showErrors(data) {
+    const errors = data && data.errors
+        ? Object.entries(data.errors).map(([field, messages]) => field + ': ' + messages.join(' '))
+        : ['Could not save the transaction, please try again.'];
+    alert(errors.join('\n'));
+}
+
+function formatDate(value) {
+    return new Date(value + 'T00:00:00').toLocaleDateString('en-US', { year: 'numeric', month: 'short', day: 'numeric' });
+}
+
+function updateBalance(data) {
+    document.getElementById('account-balance').textContent = '৳' + parseFloat(data.balance).toFixed(2);
+}
+
+// Reflect a saved transaction in its card
+function showTransaction(tx) {
+    const container = document.querySelector('[data-transaction-id="' + tx.id + '"]');
+    FIELDS.forEach(field => {
+        const input = fieldInput(container, field);
+        if (input) input.value = tx[field];
+    });
+    const amount = parseFloat(tx.amount);
+    container.querySelector('[data-view="description"]').textContent = tx.description;
+    container.querySelector('[data-view="date"]').textContent = formatDate(tx.date);
+    const amountView = container.querySelector('[data-view="amount"]');
+    amountView.textContent = (amount >= 0 ? '+' : '') + '৳' + Math.abs(amount).toFixed(2);
+    amountView.classList.toggle('amount-negative', amount < 0);
+    amountView.classList.toggle('amount-positive', amount >= 0);
+    setMode(container, 'view');
+}
+
+function setMode(container, mode) {
+    container.setAttribute('data-mode', mode);
+    container.querySelector('.view-mode').classList.toggle('d-none', mode === 'edit');
+    container.querySelector('.edit-mode').classList.toggle('d-none', mode === 'view');
+}
+
+function saveTransaction(button) {
+    const container = button.closest('[data-transaction-id]');
+    ledgerRequest(container.dataset.updateUrl, transactionBody(container))
+        .then(data => {
+            showTransaction(data.transaction);
+            updateBalance(data);
+        })
+        .catch(showErrors);
+}
+
+function deleteTransaction(button) {
+    const container = button.closest('[data-transaction-id]');
+    if (!confirm('Delete this transaction?')) return;
+    ledgerRequest(container.dataset.deleteUrl, new FormData())
+        .then(data => {
+            // Keep the formset consistent should the whole page be submitted later
+            container.querySelectorAll('input[name$="-DELETE"]').forEach(checkbox => { checkbox.checked = true; });
+            container.classList.add('d-none');
+            updateBalance(data);
+        })
+        .catch(showErrors);
+}
+
+// Show a transaction created through the JSON endpoint at the top of the list
+function insertTransaction(tx) {
+    const item = document.getElementById('saved-transaction-card').content.firstElementChild.cloneNode(true);
+    item.dataset.transactionId = tx.id;
+    item.dataset.updateUrl = transactionsForm.dataset.updateUrl.replace(/\/0\/$/, '/' + tx.id + '/');
+    item.dataset.deleteUrl = transactionsForm.dataset.deleteUrl.replace(/\/0\/delete\/$/, '/' + tx.id + '/delete/');
+    const list = document.getElementById('saved-transactions');
+    list.insertBefore(item, list.querySelector('.transaction-card'));
+    showTransaction(tx);
+}
+
+// New transactions are created one by one unless saved rows still have pending edits
+transactionsForm.addEventListener('submit', async function(event) {
+    const pendingEdits = transactionsForm.querySelector('[data-transaction-id][data-mode="edit"]');
+    const newCards = Array.from(document.querySelectorAll('#transaction-formset .new-transaction-card'))
+        .filter(card => FIELDS.slice(0, 2).some(field => fieldInput(card, field).value));
+    if (pendingEdits || !newCards.length) return;
+
+    event.preventDefault();
+    for (const card of newCards) {
+        try {
+            const data = await ledgerRequest(transactionsForm.dataset.createUrl, transactionBody(card));
+            insertTransaction(data.transaction);
+            updateBalance(data);
+            card.remove();
+        } catch (data) {
+            showErrors(data);
+            return;
+        }
+    }
+    addTransactionForm();
+});
+
+function editTransaction(button) {
+    setMode(button.closest('[data-transaction-id]'), 'edit');
+}
+
+function cancelEditTransaction(button) {
+    setMode(button.closest('[data-transaction-id]'), 'view');
+}
+
+// Auto-hide messages
+document.addEventListener('DOMContentLoaded', function() {
+    const alerts = document.querySelectorAll('.alert');
+    alerts.forEach(alert => {
+        setTimeout(() => {
+            alert.style.transition = 'opacity 0.5s';
+            alert.style.opacity = '0';
+            setTimeout(() => alert.remove(), 500);
+        }, 5000);
+    });
+});
@@ -0,0 +1,46 @@
+document.querySelectorAll('[data-balance-chart]').forEach(function(chart) {
+    const line = chart.querySelector('polyline');
+    const zero = chart.querySelector('[data-zero]');
+    const range = chart.querySelector('[data-range]');
+
+    function draw(points) {
+        range.textContent = '';
+        if (!points.length) {
+            line.setAttribute('points', '');
+            return;
+        }
+        const values = points.map(function(point) { return parseFloat(point.balance); });
+        const low = Math.min(0, ...values), high = Math.max(0, ...values);
+        const span = (high - low) || 1;
+        const y = function(value) { return 115 - (value - low) / span * 110; };
+        const step = points.length > 1 ? 600 / (points.length - 1) : 0;
+        line.setAttribute('points', values.map(function(value, index) {
+            return (index * step).toFixed(1) + ',' + y(value).toFixed(1);
+        }).join(' '));
+        zero.setAttribute('y1', y(0));
+        zero.setAttribute('y2', y(0));
+        [points[0].date, points[points.length - 1].date].forEach(function(date) {
+            const label = document.createElement('span');
+            label.textContent = date;
+            range.appendChild(label);
+        });
+    }
+
+    function load(interval) {
+        const url = new URL(chart.dataset.url, window.location.origin);
+        url.searchParams.set('interval', interval);
+        fetch(url, { credentials: 'same-origin' })
+            .then(function(response) { return response.json(); })
+            .then(function(data) { draw(data.points || []); });
+    }
+
+    chart.querySelectorAll('[data-interval]').forEach(function(button) {
+        button.addEventListener('click', function() {
+            chart.querySelectorAll('[data-interval]').forEach(function(other) {
+                other.classList.toggle('active', other === button);
+            });
+            load(button.dataset.interval);
+        });
+    });
+    load('month');
+});
@@ -0,0 +1,109 @@
+// Google Keep style interactions
+document.addEventListener('DOMContentLoaded', function() {
+    // Handle card clicks
+    document.querySelectorAll('.keep-card[data-account-url]').forEach(card => {
+        card.addEventListener('click', function(e) {
+            // Don't navigate if clicking on dropdown or its children
+            if (!e.target.closest('.account-actions')) {
+                window.location.href = this.dataset.accountUrl;
+            }
+        });
+
+        // Add keyboard support
+        card.addEventListener('keypress', function(e) {
+            if (e.key === 'Enter' && !e.target.closest('.account-actions')) {
+                window.location.href = this.dataset.accountUrl;
+            }
+        });
+    });
+
+    // Handle FAB button click
+    const fabButton = document.querySelector('.fab-add[data-create-url]');
+    if (fabButton) {
+        fabButton.addEventListener('click', function() {
+            window.location.href = this.dataset.createUrl;
+        });
+    }
+
+    // Auto-hide messages after 5 seconds
+    const alerts = document.querySelectorAll('.alert');
+    alerts.forEach(alert => {
+        setTimeout(() => {
+            alert.style.transition = 'opacity 0.5s';
+            alert.style.opacity = '0';
+            setTimeout(() => alert.remove(), 500);
+        }, 5000);
+    });
+
+    // Search functionality - Filter accounts by name only
+    function performSearch(searchTerm) {
+        const cards = document.querySelectorAll('.masonry-item');
+        const searchLower = searchTerm.toLowerCase().trim();
+        let visibleCount = 0;
+
+        cards.forEach(card => {
+            const accountNameElement = card.querySelector('.account-title');
+            if (accountNameElement) {
+                const accountName = accountNameElement.textContent.toLowerCase();
+
+                if (searchLower === '' || accountName.includes(searchLower)) {
+                    card.style.display = 'block';
+                    visibleCount++;
+                } else {
+                    card.style.display = 'none';
+                }
+            }
+        });
+
+        // Show/hide "no results" message
+        showNoResults(visibleCount === 0 && searchLower !== '');
+    }
+
+    // Show "No results" message
+    function showNoResults(show) {
+        let noResultsMsg = document.getElementById('noResultsMessage');
+
+        if (show) {
+            if (!noResultsMsg) {
+                noResultsMsg = document.createElement('div');
+                noResultsMsg.id = 'noResultsMessage';
+                noResultsMsg.className = 'text-center py-5';
+                noResultsMsg.innerHTML = `
+                    <div class="keep-card d-inline-block" style="max-width: 400px;">
+                        <div class="p-4">
+                            <i class="fas fa-search text-muted mb-3" style="font-size: 3rem; opacity: 0.3;"></i>
+                            <h5 class="text-muted mb-2">No accounts found</h5>
+                            <p class="text-muted mb-0" style="font-size: 0.9rem;">Try a different search term</p>
+                        </div>
+                    </div>
+                `;
+                const grid = document.getElementById('accountsGrid');
+                if (grid) {
+                    grid.parentNode.insertBefore(noResultsMsg, grid.nextSibling);
+                }
+            }
+            noResultsMsg.style.display = 'block';
+        } else {
+            if (noResultsMsg) {
+                noResultsMsg.style.display = 'none';
+            }
+        }
+    }
+
+    // Header search
+    const headerSearch = document.getElementById('headerSearch');
+    if (headerSearch) {
+        headerSearch.addEventListener('input', function() {
+            performSearch(this.value);
+        });
+
+        // Add clear button functionality on Escape key
+        headerSearch.addEventListener('keydown', function(e) {
+            if (e.key === 'Escape') {
+                this.value = '';
+                performSearch('');
+                this.blur();
+            }
+        });
+    }
+});
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+
+from .cache import get_user_cache, user_cache_key
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that loads the session's user from the cache, so an
+    authenticated request does not query the user table. User.save() and
+    User.delete() drop the cached copy, which covers profile edits, password
+    changes (the session hash is checked against the fresh password) and
+    deactivation. Queryset update() calls bypass that and are not seen until
+    USER_CACHE_TIMEOUT passes.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = get_user_cache().get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            get_user_cache().set(key, user, getattr(settings, 'USER_CACHE_TIMEOUT', 300))
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = await get_user_cache().aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is None:
+                return None
+            await get_user_cache().aset(key, user, getattr(settings, 'USER_CACHE_TIMEOUT', 300))
+        return user if self.user_can_authenticate(user) else None
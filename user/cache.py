@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def get_user_cache():
+    """Cache backend holding users loaded by user.backends.CachedModelBackend (USER_CACHE_ALIAS)"""
+    return caches[getattr(settings, 'USER_CACHE_ALIAS', 'default')]
+
+
+def user_cache_key(user_id):
+    return f'user:user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    """Drop a cached user now and again once the transaction commits"""
+    if user_id is None:
+        return
+    key = user_cache_key(user_id)
+    get_user_cache().delete(key)
+    # A concurrent request may re-cache the old row before we commit
+    transaction.on_commit(lambda: get_user_cache().delete(key))
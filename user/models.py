@@ -2,6 +2,8 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.core.validators import RegexValidator
 
+from .cache import invalidate_cached_user
+
 class UserManager(BaseUserManager):
     """Custom user manager for email-based authentication"""
     
@@ -79,3 +81,11 @@ class User(AbstractUser):
         else:
             self.is_profile_complete = False
         super().save(*args, **kwargs)
+        # Sessions load the user from the cache with user.backends.CachedModelBackend
+        invalidate_cached_user(self.pk)
+
+    def delete(self, *args, **kwargs):
+        user_id = self.pk
+        result = super().delete(*args, **kwargs)
+        invalidate_cached_user(user_id)
+        return result
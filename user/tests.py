@@ -1,3 +1,80 @@
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from .backends import CachedModelBackend
+from .models import User
+
+
+@override_settings(
+    SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+    AUTHENTICATION_BACKENDS=['user.backends.CachedModelBackend'],
+)
+class CachedAuthTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='owner@example.com', password='secret123')
+        self.client.force_login(self.user)
+
+    def auth_queries(self, url):
+        """Queries against the session and user tables while requesting url"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        tables = (User._meta.db_table, 'django_session')
+        return response, [query['sql'] for query in queries if any(table in query['sql'] for table in tables)]
+
+    def test_authenticated_requests_skip_session_and_user_queries(self):
+        url = reverse('profile')
+        self.client.get(url)
+        response, queries = self.auth_queries(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'], self.user)
+        self.assertEqual(queries, [])
+
+    def test_profile_change_is_seen_immediately(self):
+        dashboard = reverse('hisab_dashboard')
+        self.assertRedirects(self.client.get(dashboard), reverse('profile'))
+
+        self.client.post(reverse('profile'), {
+            'email': self.user.email, 'full_name': 'Test Owner', 'mobile': '01712345678',
+        })
+        response = self.client.get(dashboard)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['user'].full_name, 'Test Owner')
+
+    def test_password_change_logs_out_other_sessions(self):
+        other_session = self.client_class()
+        other_session.force_login(self.user)
+        self.assertEqual(other_session.get(reverse('profile')).status_code, 200)
+
+        response = self.client.post(reverse('password_change'), {
+            'old_password': 'secret123', 'new_password1': 'n3w-Secret!', 'new_password2': 'n3w-Secret!',
+        })
+        self.assertRedirects(response, reverse('password_change_done'))
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 200)
+        self.assertRedirects(
+            other_session.get(reverse('profile')), f"{reverse('login')}?next={reverse('profile')}"
+        )
+
+    def test_deactivated_user_is_logged_out(self):
+        self.client.get(reverse('profile'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(reverse('profile')).status_code, 302)
+
+    async def test_async_lookup_caches_the_user(self):
+        await sync_to_async(cache.clear)()
+        backend = CachedModelBackend()
+        self.assertEqual(await backend.aget_user(self.user.pk), self.user)
+
+        # Queryset updates skip invalidation, so the cached copy is still served
+        await User.objects.filter(pk=self.user.pk).aupdate(full_name='Changed')
+        user = await backend.aget_user(self.user.pk)
+        self.assertEqual(user.full_name, self.user.full_name)
+
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        await sync_to_async(cache.clear)()
+        self.assertIsNone(await backend.aget_user(self.user.pk))